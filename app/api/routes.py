@@ -1,38 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-import redis.asyncio as redis
 from app.core.config import settings
 from app.db.session import get_db
-from app.db.models import User, Auction, Bid
-from app.schemas.auction import UserCreate, AuctionCreate, AuctionResponse, BidRequest
-from app.services.websocket import manager
-from app.services.kafka import KafkaService
+from app.db.models import User, Auction, Bid, AuctionStats
+from app.schemas.auction import (
+    UserCreate, AuctionCreate, AuctionResponse, AuctionStatsResponse, BidRequest, HotAuction, HotAuctionsResponse,
+    UserBulkCreate, UserBulkResponse, CreatedUser, AuctionBulkCreate, AuctionBulkResponse, CreatedAuction, BulkItemError,
+)
+from app.schemas.websocket import SubscriptionRequest
+from app.services.hot_keys import hot_auctions
+from app.services.redis import RedisService, auction_ends_at_key, auction_price_key
+from app.services.websocket import manager, SubscriptionLimitError
 from fastapi import WebSocket, WebSocketDisconnect
 
 router = APIRouter()
-redis_client = redis.from_url(settings.REDIS_URL)
 
 # 1. Create a user
 @router.post("/users")
 async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
-    new_user = User(username=user.username)
-    db.add(new_user)
-    try:
-        await db.commit()
-        await db.refresh(new_user)
-        return {"id": new_user.id, "username": new_user.username}
-    except Exception:
-        await db.rollback()
+    # INSERT ... RETURNING: the generated id comes back with the insert (no refresh round trip)
+    result = await db.execute(
+        insert(User)
+        .values(username=user.username)
+        .on_conflict_do_nothing(index_elements=[User.username])
+        .returning(User.id, User.username)
+    )
+    created = result.first()
+    await db.commit()
+    if created is None:
         raise HTTPException(status_code=400, detail="User may already exist.")
+    return {"id": created.id, "username": created.username}
 
 # 2. Create a new auction item (e.g., iPhone 15)
 @router.post("/auctions", response_model=AuctionResponse)
 async def create_auction(item: AuctionCreate, db: AsyncSession = Depends(get_db)):
-    new_item = Auction(item_name=item.item_name, current_price=item.current_price)
-    db.add(new_item)
+    if item.ends_at is not None and item.ends_at <= datetime.now(timezone.utc):
+        raise HTTPException(status_code=400, detail="ends_at must be in the future.")
+    # The closing scheduler (app/closer.py) picks up new auctions with a deadline on its next poll
+    new_item = await db.scalar(
+        insert(Auction)
+        .values(item_name=item.item_name, current_price=item.current_price, ends_at=item.ends_at)
+        .returning(Auction)
+    )
     await db.commit()
-    await db.refresh(new_item)
     return new_item
 
 # 3. Get all auction items (for verification)
@@ -43,12 +58,165 @@ async def get_auctions(db: AsyncSession = Depends(get_db)):
     return auctions
 
 # 4. Notice new price updates via WebSocket (for real-time updates)
+# Listen-only: no app-level pings; dead peers are found by protocol-level ping frames and failed sends
 @router.websocket("/ws/auction/{auction_id}")
 async def websocket_endpoint(websocket: WebSocket, auction_id: str):
-    await manager.connect(websocket, auction_id)
+    connection = await manager.connect(websocket, auction_id)
+    try:
+        while True:
+            await websocket.receive_text()
+            if not manager.touch(connection):
+                await manager.close(connection, code=1008, reason="Inbound rate limit exceeded")
+                return
+    except WebSocketDisconnect:
+        manager.disconnect(websocket)
+
+# 5. Multiplexed WebSocket: subscribe to many auctions over one connection
+# Control messages: {"action": "subscribe" | "unsubscribe", "auction_ids": [...], "max_rate": 2}
+# Clients must answer server pings ({"type": "ping"}) with any message, e.g. {"type": "pong"}
+@router.websocket("/ws/auctions")
+async def multiplexed_websocket_endpoint(websocket: WebSocket):
+    connection = await manager.accept(websocket, heartbeat=True)
     try:
         while True:
-            data = await websocket.receive_text()
-            
+            raw = await websocket.receive_text()
+            if not manager.touch(connection):
+                await manager.close(connection, code=1008, reason="Inbound rate limit exceeded")
+                return
+            try:
+                message = json.loads(raw)
+                if isinstance(message, dict) and message.get("type") == "pong":
+                    continue
+                request = SubscriptionRequest.model_validate(message)
+            except (ValueError, ValidationError):
+                await websocket.send_json({"type": "error", "detail": "Invalid control message"})
+                continue
+
+            auction_ids = [str(aid) for aid in request.auction_ids]
+            if request.action == "unsubscribe":
+                for aid in auction_ids:
+                    manager.unsubscribe(connection, aid)
+            else:
+                for i, aid in enumerate(auction_ids):
+                    try:
+                        manager.subscribe(connection, aid, request.max_rate)
+                    except SubscriptionLimitError as e:
+                        await websocket.send_json(
+                            {"type": "error", "detail": str(e), "auction_ids": auction_ids[i:]}
+                        )
+                        break
+
+            await websocket.send_json(
+                {"type": "subscriptions", "auction_ids": manager.subscribed_auctions(connection)}
+            )
     except WebSocketDisconnect:
-        manager.disconnect(websocket, auction_id)
\ No newline at end of file
+        manager.disconnect(websocket)
+
+# 6. WebSocket layer statistics (connection counts and process memory)
+@router.get("/ws/stats")
+async def websocket_stats():
+    return manager.stats()
+
+# 7. Per-auction statistics, maintained incrementally by the bid worker (no scan over bids)
+@router.get("/auctions/{auction_id}/stats", response_model=AuctionStatsResponse)
+async def get_auction_stats(auction_id: int, db: AsyncSession = Depends(get_db)):
+    stats = await db.get(AuctionStats, auction_id)
+    if stats is not None:
+        return stats
+    if await db.get(Auction, auction_id) is None:
+        raise HTTPException(status_code=404, detail="Auction not found")
+    return AuctionStatsResponse(auction_id=auction_id)  # No bids persisted yet
+
+# 8. Hottest auctions right now (sliding-window heavy hitters from this node's bid stream)
+@router.get("/auctions/hot", response_model=HotAuctionsResponse)
+async def get_hot_auctions(limit: int = Query(default=10, ge=1, le=100)):
+    return HotAuctionsResponse(
+        window_seconds=hot_auctions.window_seconds,
+        auctions=[
+            HotAuction(
+                auction_id=auction_id,
+                bids=estimate,
+                guaranteed_bids=guaranteed,
+                bids_per_second=hot_auctions.rate(estimate),
+                hot=hot_auctions.is_hot(auction_id),
+            )
+            for auction_id, estimate, guaranteed in hot_auctions.top(limit)
+        ],
+    )
+
+# 9. Bulk-create users: one multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING per chunk.
+#    Existing or repeated usernames are reported per item; the rest of the batch is still created.
+@router.post("/users/bulk", response_model=UserBulkResponse)
+async def create_users_bulk(request: UserBulkCreate, db: AsyncSession = Depends(get_db)):
+    conflicts = []
+    pending = {}  # username -> index of its first occurrence
+    for index, user in enumerate(request.users):
+        if user.username in pending:
+            conflicts.append(BulkItemError(index=index, detail=f"Duplicate username in request: {user.username}"))
+        else:
+            pending[user.username] = index
+
+    created = []
+    usernames = list(pending)
+    for i in range(0, len(usernames), settings.BULK_INSERT_CHUNK_SIZE):
+        result = await db.execute(
+            insert(User)
+            .values([{"username": username} for username in usernames[i:i + settings.BULK_INSERT_CHUNK_SIZE]])
+            .on_conflict_do_nothing(index_elements=[User.username])
+            .returning(User.id, User.username)
+        )
+        for user_id, username in result:
+            created.append(CreatedUser(index=pending.pop(username), id=user_id, username=username))
+    await db.commit()
+
+    # Usernames that did not come back were already taken
+    conflicts.extend(
+        BulkItemError(index=index, detail=f"User already exists: {username}") for username, index in pending.items()
+    )
+    created.sort(key=lambda item: item.index)
+    conflicts.sort(key=lambda item: item.index)
+    return UserBulkResponse(created=created, conflicts=conflicts)
+
+# 10. Bulk-create auctions: one multi-row INSERT ... RETURNING per chunk (rows come back in request order),
+#     optionally pre-seeding the Redis price/deadline keys so the first bids skip the cache-miss path.
+@router.post("/auctions/bulk", response_model=AuctionBulkResponse)
+async def create_auctions_bulk(request: AuctionBulkCreate, db: AsyncSession = Depends(get_db)):
+    now = datetime.now(timezone.utc)
+    conflicts, rows, indices = [], [], []
+    for index, item in enumerate(request.auctions):
+        if item.ends_at is not None and item.ends_at <= now:
+            conflicts.append(BulkItemError(index=index, detail="ends_at must be in the future."))
+            continue
+        rows.append({"item_name": item.item_name, "current_price": item.current_price, "ends_at": item.ends_at})
+        indices.append(index)
+
+    created = []
+    chunk = settings.BULK_INSERT_CHUNK_SIZE
+    for i in range(0, len(rows), chunk):
+        result = await db.execute(
+            insert(Auction).returning(
+                Auction.id, Auction.item_name, Auction.current_price, Auction.ends_at, Auction.status,
+                sort_by_parameter_order=True,
+            ),
+            rows[i:i + chunk],
+        )
+        created.extend(
+            CreatedAuction(index=index, **row) for index, row in zip(indices[i:i + chunk], result.mappings())
+        )
+    await db.commit()
+
+    redis_seeded = False
+    if request.seed_redis and created:
+        try:
+            async with RedisService.get_client().pipeline(transaction=False) as pipe:
+                for auction in created:
+                    pipe.set(auction_price_key(auction.id), auction.current_price, nx=True)
+                    if auction.ends_at is not None:
+                        pipe.set(auction_ends_at_key(auction.id), int(auction.ends_at.timestamp() * 1000), nx=True)
+                await pipe.execute()
+            redis_seeded = True
+        except Exception as e:
+            # The auctions exist either way; the bid API seeds missing keys from the DB on first bid
+            print(f"⚠️  [Bulk] Failed to seed Redis keys: {e}")
+
+    return AuctionBulkResponse(created=created, conflicts=conflicts, redis_seeded=redis_seeded)
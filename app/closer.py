@@ -0,0 +1,19 @@
+import asyncio
+# Closing-scheduler entry point; like app/worker.py it imports no FastAPI/WebSocket modules.
+from app.db.session import dispose_engine
+from app.services.redis import RedisService
+from app.services.scheduler import AuctionCloser
+
+async def main():
+    print("⏰ Auction Closer Started! Watching auction deadlines...")
+    try:
+        await AuctionCloser().run()
+    except asyncio.CancelledError:
+        print("🛑 Closer shutting down...")
+    finally:
+        await RedisService.close()
+        await dispose_engine()
+        print("✅ Closer connections closed.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -19,6 +19,53 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://redis:6379"
     KAFKA_BOOTSTRAP_SERVERS: str = "kafka:9092"
     KAFKA_BID_TOPIC: str = "auction-bids"
+    KAFKA_CONSUMER_GROUP: str = "auction-processor"
+    # Exactly-once: store partition offsets in Postgres in the same transaction as each batch
+    # and seek to them on assignment, instead of relying on the bid_id unique index for dedup
+    KAFKA_EXACTLY_ONCE: bool = False
+
+    # Replay / state rebuild (app/replay.py)
+    REPLAY_CONSUMER_GROUP: str = "auction-replay"
+    REPLAY_BATCH_SIZE: int = 20000
+    REPLAY_PROGRESS_INTERVAL_SECONDS: float = 5.0
+
+    # Bulk creation endpoints (/users/bulk, /auctions/bulk)
+    BULK_CREATE_MAX_ITEMS: int = 50000  # items per request
+    BULK_INSERT_CHUNK_SIZE: int = 1000  # rows per multi-row INSERT ... RETURNING
+
+    # Per-auction statistics (auction_stats)
+    AUCTION_STATS_VELOCITY_ALPHA: float = 0.3  # EWMA weight of the newest price-velocity sample
+
+    # Hot auction detection (sliding-window Space-Saving sketch)
+    HOT_AUCTION_WINDOW_SECONDS: float = 60.0
+    HOT_AUCTION_BUCKETS: int = 6  # the window slides in steps of WINDOW / BUCKETS
+    HOT_AUCTION_CAPACITY: int = 256  # counters per bucket; memory is bounded by BUCKETS x CAPACITY
+    HOT_AUCTION_TOP_K: int = 10
+    HOT_AUCTION_MIN_RATE: float = 5.0  # bids per second over the window to count as hot
+    WORKER_METRICS_PORT: int = 9101
+
+    # Auction closing scheduler (app/closer.py)
+    SCHEDULER_TICK_SECONDS: float = 0.5
+    SCHEDULER_BATCH_SIZE: int = 500  # auctions closed per UPDATE
+    SCHEDULER_POLL_INTERVAL_SECONDS: float = 2.0  # how often newly created auctions are picked up
+    SCHEDULER_SWEEP_INTERVAL_SECONDS: float = 10.0  # how often overdue open auctions missed by the id cursor are closed
+
+    # WebSocket subscriptions
+    WS_MAX_SUBSCRIPTIONS_PER_CONNECTION: int = 100
+
+    # WebSocket connection lifecycle
+    WS_PING_INTERVAL_SECONDS: float = 20.0  # app-level pings (multiplexed endpoint) and protocol ping frames
+    WS_PING_TIMEOUT_SECONDS: float = 20.0  # protocol ping frame unanswered for this long -> connection closed
+    WS_IDLE_TIMEOUT_SECONDS: float = 60.0  # multiplexed endpoint: no inbound message (pong) for this long -> reaped
+    WS_SEND_TIMEOUT_SECONDS: float = 5.0
+    WS_INBOUND_RATE: float = 10.0  # inbound messages per second per connection (token bucket)
+    WS_INBOUND_BURST: int = 20
+
+    # WebSocket permessage-deflate (app/services/ws_deflate.py, used by python -m app.server)
+    WS_DEFLATE_ENABLED: bool = True
+    WS_DEFLATE_CONTEXT_TAKEOVER: bool = True  # compress each frame against the previous ones
+    WS_DEFLATE_WINDOW_BITS: int = 12  # 4 KiB history per connection
+    WS_DEFLATE_MEM_LEVEL: int = 5
 
     @property
     def DATABASE_URL(self) -> str:
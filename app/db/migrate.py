@@ -0,0 +1,100 @@
+"""Apply pending schema migrations.
+
+Usage:
+    python -m app.db.migrate            # apply everything that is pending
+    python -m app.db.migrate --status   # list applied and pending versions
+
+Runs are serialized with a Postgres advisory lock, so starting several
+instances at once (e.g. during a fleet rollout) applies each migration once.
+"""
+
+import argparse
+import asyncio
+import importlib
+import pkgutil
+from types import ModuleType
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db import migrations
+from app.db.session import dispose_engine, get_engine
+
+# Arbitrary application-wide key for pg_advisory_lock.
+MIGRATION_LOCK_ID = 7_384_221
+
+
+def load_migrations() -> list[ModuleType]:
+    """Import every migration module and return them ordered by VERSION."""
+    modules = [
+        importlib.import_module(f"{migrations.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(migrations.__path__)
+        if info.name.startswith("v")
+    ]
+    modules.sort(key=lambda m: m.VERSION)
+
+    versions = [m.VERSION for m in modules]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return modules
+
+
+async def applied_versions(conn: AsyncConnection) -> set[int]:
+    """Return the versions already recorded in schema_migrations."""
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        " version INTEGER PRIMARY KEY,"
+        " description VARCHAR NOT NULL,"
+        " applied_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL)"
+    ))
+    result = await conn.execute(text("SELECT version FROM schema_migrations"))
+    versions = {row[0] for row in result}
+    await conn.commit()
+    return versions
+
+
+async def migrate(status_only: bool = False) -> None:
+    """Apply all pending migrations, each in its own transaction."""
+    async with get_engine().connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        await conn.commit()
+        try:
+            applied = await applied_versions(conn)
+            pending = [m for m in load_migrations() if m.VERSION not in applied]
+
+            if status_only:
+                print(f"Applied: {sorted(applied) or 'none'}")
+                print(f"Pending: {[m.VERSION for m in pending] or 'none'}")
+                return
+
+            if not pending:
+                print("✅ Schema is up to date.")
+                return
+
+            for migration in pending:
+                print(f"⬆️  Applying migration {migration.VERSION}: {migration.DESCRIPTION}")
+                async with conn.begin():
+                    for statement in migration.UPGRADE:
+                        await conn.exec_driver_sql(statement)
+                    await conn.execute(
+                        text("INSERT INTO schema_migrations (version, description) VALUES (:v, :d)"),
+                        {"v": migration.VERSION, "d": migration.DESCRIPTION},
+                    )
+            print(f"✅ Applied {len(pending)} migration(s).")
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            await conn.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("--status", action="store_true", help="Only list applied/pending versions")
+    args = parser.parse_args()
+    try:
+        await migrate(status_only=args.status)
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,11 @@
+"""Versioned schema migrations.
+
+Each ``vNNNN_<name>.py`` module defines:
+
+- ``VERSION``: strictly increasing integer
+- ``DESCRIPTION``: one-line summary stored in ``schema_migrations``
+- ``UPGRADE``: list of SQL statements, applied together in one transaction
+
+Migrations are applied explicitly with ``python -m app.db.migrate``; the API
+and worker processes never issue DDL at startup.
+"""
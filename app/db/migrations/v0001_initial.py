@@ -0,0 +1,45 @@
+"""Initial schema: users, auctions and bids.
+
+Matches what ``Base.metadata.create_all`` used to create at startup, so it is a
+no-op on databases that were bootstrapped that way.
+"""
+
+VERSION = 1
+DESCRIPTION = "initial schema"
+
+UPGRADE = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL NOT NULL,
+        username VARCHAR NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username ON users (username)",
+    "CREATE INDEX IF NOT EXISTS ix_users_id ON users (id)",
+    """
+    CREATE TABLE IF NOT EXISTS auctions (
+        id SERIAL NOT NULL,
+        item_name VARCHAR NOT NULL,
+        current_price INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_auctions_id ON auctions (id)",
+    "CREATE INDEX IF NOT EXISTS ix_auctions_item_name ON auctions (item_name)",
+    """
+    CREATE TABLE IF NOT EXISTS bids (
+        id SERIAL NOT NULL,
+        bid_id VARCHAR NOT NULL,
+        price INTEGER NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        user_id INTEGER NOT NULL,
+        auction_id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id),
+        FOREIGN KEY(auction_id) REFERENCES auctions (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_bids_id ON bids (id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_bids_bid_id ON bids (bid_id)",
+]
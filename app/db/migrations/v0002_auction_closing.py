@@ -0,0 +1,14 @@
+"""Auction end times and status, for the closing scheduler."""
+
+VERSION = 2
+DESCRIPTION = "auction ends_at and status"
+
+UPGRADE = [
+    "ALTER TABLE auctions ADD COLUMN IF NOT EXISTS ends_at TIMESTAMP WITH TIME ZONE",
+    "ALTER TABLE auctions ADD COLUMN IF NOT EXISTS status VARCHAR DEFAULT 'open' NOT NULL",
+    # The scheduler loads open auctions with a deadline at startup; keep that an index scan
+    """
+    CREATE INDEX IF NOT EXISTS ix_auctions_open_ends_at ON auctions (ends_at)
+    WHERE status = 'open' AND ends_at IS NOT NULL
+    """,
+]
@@ -0,0 +1,55 @@
+"""Per-auction aggregates (bid count, unique bidders, leader, velocity).
+
+The worker keeps these up to date batch by batch; the backfill below seeds them
+from the existing bid history once.
+"""
+
+VERSION = 3
+DESCRIPTION = "auction_stats and auction_bidders"
+
+UPGRADE = [
+    """
+    CREATE TABLE IF NOT EXISTS auction_stats (
+        auction_id INTEGER NOT NULL,
+        bid_count BIGINT NOT NULL,
+        unique_bidders INTEGER NOT NULL,
+        leader_user_id INTEGER,
+        leader_price INTEGER NOT NULL,
+        last_bid_at TIMESTAMP WITH TIME ZONE,
+        price_velocity FLOAT NOT NULL,
+        PRIMARY KEY (auction_id),
+        FOREIGN KEY(auction_id) REFERENCES auctions (id),
+        FOREIGN KEY(leader_user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS auction_bidders (
+        auction_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        PRIMARY KEY (auction_id, user_id),
+        FOREIGN KEY(auction_id) REFERENCES auctions (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    # Backfill from existing bids (runs before the worker starts, see docker-compose)
+    """
+    INSERT INTO auction_bidders (auction_id, user_id)
+    SELECT DISTINCT auction_id, user_id FROM bids
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO auction_stats
+        (auction_id, bid_count, unique_bidders, leader_user_id, leader_price, last_bid_at, price_velocity)
+    SELECT
+        auction_id,
+        count(*),
+        count(DISTINCT user_id),
+        (array_agg(user_id ORDER BY price DESC, id DESC))[1],
+        max(price),
+        max(created_at),
+        0
+    FROM bids
+    GROUP BY auction_id
+    ON CONFLICT DO NOTHING
+    """,
+]
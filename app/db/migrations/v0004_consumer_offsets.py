@@ -0,0 +1,17 @@
+"""Kafka partition offsets stored next to the data they produced (exactly-once consumer mode)."""
+
+VERSION = 4
+DESCRIPTION = "consumer_offsets"
+
+UPGRADE = [
+    """
+    CREATE TABLE IF NOT EXISTS consumer_offsets (
+        group_id VARCHAR NOT NULL,
+        topic VARCHAR NOT NULL,
+        partition INTEGER NOT NULL,
+        next_offset BIGINT NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        PRIMARY KEY (group_id, topic, partition)
+    )
+    """,
+]
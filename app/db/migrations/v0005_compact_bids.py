@@ -0,0 +1,34 @@
+"""Compact, append-friendly bid storage.
+
+- ``bids.bid_id``: VARCHAR (37 bytes with header) -> native UUID (16 bytes). Producers now emit
+  time-ordered UUIDv7 ids, so the unique index grows at its right edge instead of splitting random
+  pages. Any legacy value that is not a valid UUID is mapped to the UUID of its MD5 hash.
+- ``bids.id``: INTEGER -> BIGINT (and its sequence), so the fastest-growing table cannot run out of keys.
+- Drops the ``ix_*_id`` B-trees that duplicate the primary keys, and adds a BRIN index on
+  ``bids.created_at`` for time-range scans.
+
+The column type changes rewrite ``bids`` under an exclusive lock; run it in a maintenance window
+on large tables.
+"""
+
+VERSION = 5
+DESCRIPTION = "compact bid schema (UUID bid_id, BIGINT id, BRIN created_at)"
+
+UPGRADE = [
+    "DROP INDEX IF EXISTS ix_users_id",
+    "DROP INDEX IF EXISTS ix_auctions_id",
+    "DROP INDEX IF EXISTS ix_bids_id",
+    """
+    ALTER TABLE bids
+        ALTER COLUMN id TYPE BIGINT,
+        ALTER COLUMN bid_id TYPE UUID USING (
+            CASE
+                WHEN bid_id ~* '^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$'
+                THEN bid_id::uuid
+                ELSE md5(bid_id)::uuid
+            END
+        )
+    """,
+    "ALTER SEQUENCE IF EXISTS bids_id_seq AS BIGINT",
+    "CREATE INDEX IF NOT EXISTS ix_bids_created_at_brin ON bids USING brin (created_at)",
+]
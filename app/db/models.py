@@ -1,14 +1,18 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, BigInteger, Float, String, ForeignKey, DateTime, Index, Uuid
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 
 Base = declarative_base()
 
+# Auction lifecycle states (auctions.status)
+AUCTION_OPEN = "open"
+AUCTION_CLOSED = "closed"
+
 # 1. User table
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     username = Column(String, unique=True, index=True, nullable=False)
     
     # One user can have many bids
@@ -19,9 +23,11 @@ class User(Base):
 class Auction(Base):
     __tablename__ = "auctions"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     item_name = Column(String, index=True, nullable=False)  # e.g. "iPhone 15 Pro"
     current_price = Column(Integer, default=0, nullable=False)  # current highest bid
+    ends_at = Column(DateTime(timezone=True), nullable=True)  # closing time (None = no deadline); anti-sniping may extend it
+    status = Column(String, default=AUCTION_OPEN, server_default=AUCTION_OPEN, nullable=False)  # open / closed
     
     # One auction can have many bids
     bids = relationship("Bid", back_populates="auction")
@@ -31,8 +37,14 @@ class Auction(Base):
 class Bid(Base):
     __tablename__ = "bids"
 
-    id = Column(Integer, primary_key=True, index=True)
-    bid_id = Column(String, unique=True, index=True, nullable=False)  # unique bid identifier
+    __table_args__ = (
+        # Bids are append-only, so created_at follows physical order; a BRIN index serves time-range
+        # scans at a few KB per million rows instead of a B-tree entry per row
+        Index("ix_bids_created_at_brin", "created_at", postgresql_using="brin"),
+    )
+
+    id = Column(BigInteger, primary_key=True)  # the fastest-growing table gets 64-bit keys
+    bid_id = Column(Uuid(as_uuid=True), unique=True, index=True, nullable=False)  # UUIDv7: time-ordered, 16 bytes
     price = Column(Integer, nullable=False)  # bid amount
     created_at = Column(
         DateTime(timezone=True),
@@ -46,4 +58,36 @@ class Bid(Base):
     
     # Relationships
     user = relationship("User", back_populates="bids")
-    auction = relationship("Auction", back_populates="bids")
\ No newline at end of file
+    auction = relationship("Auction", back_populates="bids")
+
+
+# 4. Per-auction aggregates, maintained by the persistence worker in the same transaction as each bid batch
+class AuctionStats(Base):
+    __tablename__ = "auction_stats"
+
+    auction_id = Column(Integer, ForeignKey("auctions.id"), primary_key=True)
+    bid_count = Column(BigInteger, default=0, nullable=False)
+    unique_bidders = Column(Integer, default=0, nullable=False)
+    leader_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # user with the highest bid
+    leader_price = Column(Integer, default=0, nullable=False)
+    last_bid_at = Column(DateTime(timezone=True), nullable=True)
+    price_velocity = Column(Float, default=0.0, nullable=False)  # EWMA of price increase per second
+
+
+# 5. Distinct (auction, bidder) pairs; lets the worker count new bidders without scanning bids
+class AuctionBidder(Base):
+    __tablename__ = "auction_bidders"
+
+    auction_id = Column(Integer, ForeignKey("auctions.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+
+
+# 6. Kafka consumer positions, written in the same transaction as each bid batch (exactly-once mode)
+class ConsumerOffset(Base):
+    __tablename__ = "consumer_offsets"
+
+    group_id = Column(String, primary_key=True)
+    topic = Column(String, primary_key=True)
+    partition = Column(Integer, primary_key=True)
+    next_offset = Column(BigInteger, nullable=False)  # offset of the next record to consume
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,27 +1,47 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
 from app.core.config import settings
 
-# 1. Create async database engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,  # Log SQL queries (useful for debugging)
-    future=True
-)
+# The engine and session factory are created on first use rather than at import time,
+# so importing the app (or a CLI tool) never touches the database.
+_engine: AsyncEngine = None
+_sessionmaker: async_sessionmaker = None
+
+# 1. Async database engine
+def get_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            settings.DATABASE_URL,
+            echo=True,  # Log SQL queries (useful for debugging)
+            future=True
+        )
+    return _engine
 
 # 2. Session factory
 # A new AsyncSession instance will be created for each incoming request
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False
-)
+def get_sessionmaker() -> async_sessionmaker:
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(
+            bind=get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False
+        )
+    return _sessionmaker
+
+async def dispose_engine() -> None:
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _sessionmaker = None
 
 # 3. Dependency function for FastAPI
 # Used in endpoints as: db: AsyncSession = Depends(get_db)
 async def get_db():
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         try:    
             yield session           
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
@@ -2,20 +2,19 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 import asyncio
 import json
-import redis.asyncio as redis
 
 from app.core.config import settings
-from app.db.session import engine
-from app.db.models import Base
+from app.db.session import dispose_engine
 from app.api.routes import router as api_router
+from app.services.hot_keys import hot_auctions
+from app.services.metrics import register_hot_auction_metrics
+from app.services.redis import RedisService
 from app.services.websocket import manager
-from app.services.kafka import KafkaService, consume_and_save_bids
-
-redis_subscriber = redis.from_url(settings.REDIS_URL)
+from prometheus_client import make_asgi_app
 
 async def redis_listener():
     """Continuously listen to the Redis Pub/Sub channel and send messages via WebSocket when a message is received."""
-    async with redis_subscriber.pubsub() as pubsub:
+    async with RedisService.get_client().pubsub() as pubsub:
         await pubsub.subscribe("auction_channel")
         print("🎧 Redis Listener Started: Listening on 'auction_channel'")
         
@@ -26,32 +25,43 @@ async def redis_listener():
                     data_dict = json.loads(data)
                     auction_id = data_dict.get("auction_id")
                     amount = data_dict.get("amount")
+                    if amount is not None:
+                        hot_auctions.record(auction_id)  # Every accepted bid is published once
                     print(f"📣 [Broadcasting to Room {auction_id}] New Price: {amount}")
-                    # Send to specific auction_id clients
-                    await manager.broadcast_to_auction(data, auction_id)
+                    # Send to specific auction_id clients (rooms are keyed by the path string)
+                    await manager.broadcast_to_auction(data, str(auction_id), data_dict)
                 except json.JSONDecodeError:
                     print(f"⚠️  Received non-JSON message: {data}")
+                except Exception as e:
+                    # One bad message must not stop fan-out for every viewer on this node
+                    print(f"❌ [Broadcast Error] Failed to deliver message {data}: {e}")
 
 # Lifespan: logic that runs when the app starts and stops
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # 1. On server startup: create database tables if they do not exist
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
+    # 1. On server startup: start the Pub/Sub listener.
+    # The schema is managed by explicit migrations (python -m app.db.migrate), not at boot.
     redis_task = asyncio.create_task(redis_listener())
+    heartbeat_task = asyncio.create_task(manager.run_heartbeat())
 
     # Application runs and serves requests between yield and the code below
     yield
 
     # 2. On server shutdown: clean up resources
     redis_task.cancel()
+    heartbeat_task.cancel()
+    await RedisService.close()
+    await dispose_engine()
     print("🛑 Shutting down WebSocket/API Server...")
 
 app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 app.include_router(api_router, prefix="/api/v1")
 
+# Prometheus scrape endpoint (hot auctions as seen by this node's Pub/Sub listener)
+register_hot_auction_metrics("api")
+app.mount("/metrics", make_asgi_app())
+
 @app.get("/")
 def health_check():
     return {"status": "ok", "message": "Python WebSocket Server is Running! 🚀"}
\ No newline at end of file
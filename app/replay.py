@@ -0,0 +1,55 @@
+"""Replay the bid topic to rebuild Postgres and Redis state.
+
+Usage:
+    python -m app.replay                                   # whole topic
+    python -m app.replay --from-timestamp 2024-05-01T12:00:00Z
+    python -m app.replay --from-offset 150000
+    python -m app.replay --resume                          # continue an interrupted replay
+
+Reads under its own consumer group (REPLAY_CONSUMER_GROUP) up to the end offsets
+seen at startup, so it can run next to the live worker. Bids that already exist
+are skipped (unique bid_id), so a replay over intact data is a no-op apart from
+re-merging prices. The replay refuses to run if the ix_bids_bid_id unique index
+was dropped (an option in exactly-once mode); recreate it first.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+# Like app/worker.py this entry point imports no FastAPI/WebSocket modules.
+from app.core.config import settings
+from app.services.redis import RedisService
+from app.services.replay import BidReplayer
+
+
+def parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild bids, auctions and the Redis cache from Kafka")
+    start = parser.add_mutually_exclusive_group()
+    start.add_argument("--from-offset", type=int, help="Start every partition at this offset")
+    start.add_argument("--from-timestamp", type=parse_timestamp, help="ISO-8601 time (UTC if no offset)")
+    start.add_argument("--resume", action="store_true", help="Continue from the replay group's committed offsets")
+    parser.add_argument("--batch-size", type=int, default=settings.REPLAY_BATCH_SIZE)
+    parser.add_argument("--group", default=settings.REPLAY_CONSUMER_GROUP, help="Replay consumer group")
+    parser.add_argument("--skip-redis", action="store_true", help="Do not rebuild Redis price/deadline keys")
+    args = parser.parse_args()
+
+    if args.group == settings.KAFKA_CONSUMER_GROUP:
+        parser.error("the replay must not use the live worker's consumer group")
+
+    replayer = BidReplayer(batch_size=args.batch_size, group_id=args.group)
+    try:
+        await replayer.assign(args.from_offset, args.from_timestamp, args.resume)
+        await replayer.run(rebuild_redis=not args.skip_redis)
+    finally:
+        await replayer.close()
+        await RedisService.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,9 +1,22 @@
-from pydantic import BaseModel
+from datetime import datetime, timezone
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config import settings
 
 # 1. Data received when creating a new auction
 class AuctionCreate(BaseModel):
     item_name: str
     current_price: int = 0
+    ends_at: Optional[datetime] = None  # closing time; None = no deadline
+
+    @field_validator("ends_at")
+    @classmethod
+    def assume_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Timestamps without an offset are interpreted as UTC
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
 
 # 2. Data received when creating a new user
 class UserCreate(BaseModel):
@@ -14,6 +27,8 @@ class AuctionResponse(BaseModel):
     id: int
     item_name: str
     current_price: int
+    ends_at: Optional[datetime] = None
+    status: str
 
     class Config:
         # Allow creating this schema directly from ORM objects (SQLAlchemy models)
@@ -23,4 +38,58 @@ class AuctionResponse(BaseModel):
 class BidRequest(BaseModel):
     user_id: int
     auction_id: int
-    amount: int
\ No newline at end of file
+    amount: int
+
+# 5. Per-auction statistics (O(1) lookup in auction_stats)
+class AuctionStatsResponse(BaseModel):
+    auction_id: int
+    bid_count: int = 0
+    unique_bidders: int = 0
+    leader_user_id: Optional[int] = None
+    leader_price: Optional[int] = None
+    last_bid_at: Optional[datetime] = None
+    price_velocity: float = 0.0  # price units per second (EWMA)
+
+    class Config:
+        from_attributes = True
+
+# 6. Hot auctions over the sliding window (heavy-hitter sketch)
+class HotAuction(BaseModel):
+    auction_id: int
+    bids: int  # estimate; may overcount
+    guaranteed_bids: int  # lower bound
+    bids_per_second: float
+    hot: bool  # above HOT_AUCTION_MIN_RATE and within the top-k
+
+class HotAuctionsResponse(BaseModel):
+    window_seconds: float
+    auctions: List[HotAuction]
+
+# 7. Bulk creation (one multi-row INSERT ... RETURNING per chunk)
+class UserBulkCreate(BaseModel):
+    users: List[UserCreate] = Field(min_length=1, max_length=settings.BULK_CREATE_MAX_ITEMS)
+
+class AuctionBulkCreate(BaseModel):
+    auctions: List[AuctionCreate] = Field(min_length=1, max_length=settings.BULK_CREATE_MAX_ITEMS)
+    seed_redis: bool = False  # also write auction:{id}:price (and :ends_at) for the new auctions
+
+class BulkItemError(BaseModel):
+    index: int  # position in the request array
+    detail: str
+
+class CreatedUser(BaseModel):
+    index: int
+    id: int
+    username: str
+
+class UserBulkResponse(BaseModel):
+    created: List[CreatedUser]
+    conflicts: List[BulkItemError]  # e.g. duplicate usernames; the rest of the batch is still created
+
+class CreatedAuction(AuctionResponse):
+    index: int
+
+class AuctionBulkResponse(BaseModel):
+    created: List[CreatedAuction]
+    conflicts: List[BulkItemError]
+    redis_seeded: bool = False
@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+from app.core.config import settings
+
+# 1. Control message sent by clients of the multiplexed WebSocket endpoint
+#    e.g. {"action": "subscribe", "auction_ids": [1, 2, 3], "max_rate": 2}
+class SubscriptionRequest(BaseModel):
+    action: Literal["subscribe", "unsubscribe"]
+    # Capped at the per-connection limit, so one frame cannot carry an unbounded list
+    auction_ids: List[int] = Field(min_length=1, max_length=settings.WS_MAX_SUBSCRIPTIONS_PER_CONNECTION)
+    # Optional per-subscription cap on updates per second (latest price wins); None = every update
+    max_rate: Optional[float] = Field(default=None, gt=0)
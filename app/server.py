@@ -0,0 +1,24 @@
+import argparse
+# WebSocket/API server entry point: uvicorn with the tuned permessage-deflate protocol
+import uvicorn
+
+from app.core.config import settings
+from app.services.ws_deflate import DeflateWebSocketProtocol
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API and WebSocket server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        ws=DeflateWebSocketProtocol,
+        # Protocol-level ping frames: the liveness check for listen-only viewers (browsers answer them)
+        ws_ping_interval=settings.WS_PING_INTERVAL_SECONDS,
+        ws_ping_timeout=settings.WS_PING_TIMEOUT_SECONDS,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, List, Mapping, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+class SpaceSaving:
+    """Space-Saving top-k summary (Metwally et al.) with at most ``capacity`` counters.
+
+    When a new key arrives and the summary is full, the key with the smallest
+    counter is evicted and the newcomer inherits its count. Every key with a true
+    frequency above ``total / capacity`` is therefore guaranteed to be tracked.
+    ``counts[key] - errors[key]`` is a lower bound of the true count and
+    ``counts[key]`` an upper bound.
+
+    The minimum is found through a lazily invalidated heap. Stale entries are
+    skipped on eviction, and the heap is rebuilt when it grows past a few times
+    the capacity, so memory stays O(capacity).
+    """
+
+    __slots__ = ("capacity", "counts", "errors", "_heap", "_seq")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        # (count, tie-breaker, key); an entry is live only while its count matches counts[key]
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._seq = itertools.count()
+
+    def add(self, key: Hashable, count: int = 1) -> None:
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = 0
+        else:
+            floor = self._pop_min()
+            self.counts[key] = floor + count
+            self.errors[key] = floor
+        heapq.heappush(self._heap, (self.counts[key], next(self._seq), key))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+
+    def _pop_min(self) -> int:
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                del self.counts[key]
+                del self.errors[key]
+                return count
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(count, next(self._seq), key) for key, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+
+class HotKeyTracker:
+    """Sliding-window heavy hitters over a ring of Space-Saving summaries.
+
+    The window is split into ``buckets`` time slices with one summary each.
+    Slices that fall out of the window are dropped whole. Memory is bounded by
+    ``buckets * capacity`` counters, however many keys the stream contains.
+    Queries merge the live slices, so the window slides in steps of
+    ``window_seconds / buckets``.
+
+    A lock guards the ring because the worker's Prometheus exporter reads it
+    from its own thread.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        buckets: int,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self.capacity = capacity
+        self._span = window_seconds / buckets
+        self._clock = clock
+        self._ring: Deque[Tuple[int, SpaceSaving]] = deque()
+        self._lock = threading.Lock()
+        self._hot: Set[Hashable] = set()
+        self._hot_at = float("-inf")
+        self._started: Optional[float] = None  # start of the first bucket ever created
+
+    def record(self, key: Hashable, count: int = 1, now: Optional[float] = None) -> None:
+        with self._lock:
+            self._bucket(self._clock() if now is None else now).add(key, count)
+
+    def record_many(self, counts: Mapping[Hashable, int], now: Optional[float] = None) -> None:
+        """Record a pre-aggregated batch (e.g. a ``Counter`` of one consumer batch)."""
+        with self._lock:
+            summary = self._bucket(self._clock() if now is None else now)
+            for key, count in counts.items():
+                summary.add(key, count)
+
+    def top(self, n: int, now: Optional[float] = None) -> List[Tuple[Hashable, int, int]]:
+        """Return up to ``n`` ``(key, estimate, guaranteed)`` tuples, hottest first.
+
+        ``estimate`` may overcount; ``guaranteed`` is a lower bound of the true count
+        over the window.
+        """
+        estimates: Dict[Hashable, int] = {}
+        errors: Dict[Hashable, int] = {}
+        with self._lock:
+            self._expire(self._clock() if now is None else now)
+            for _, summary in self._ring:
+                for key, count in summary.counts.items():
+                    estimates[key] = estimates.get(key, 0) + count
+                    errors[key] = errors.get(key, 0) + summary.errors[key]
+        hottest = heapq.nlargest(n, estimates.items(), key=lambda item: item[1])
+        return [(key, count, count - errors[key]) for key, count in hottest]
+
+    def rate(self, count: int, now: Optional[float] = None) -> float:
+        """Convert a window count into events per second.
+
+        The divisor is the time the live buckets actually cover: ``buckets - 1``
+        full spans plus the elapsed part of the current one, or less right after
+        startup. It is floored at one span so a fresh bucket does not spike the rate.
+        """
+        return count / self.covered_seconds(now)
+
+    def covered_seconds(self, now: Optional[float] = None) -> float:
+        now = self._clock() if now is None else now
+        start = (int(now // self._span) - self.buckets + 1) * self._span
+        if self._started is not None:
+            start = max(start, self._started)
+        return max(now - start, self._span)
+
+    def is_hot(self, key: Hashable, now: Optional[float] = None) -> bool:
+        """True if ``key`` is among the top ``HOT_AUCTION_TOP_K`` keys and above ``HOT_AUCTION_MIN_RATE``.
+
+        The hot set is recomputed at most once per bucket span, so this is cheap
+        enough to call on every message.
+        """
+        now = self._clock() if now is None else now
+        if now - self._hot_at >= self._span:
+            self._hot = {
+                key
+                for key, estimate, _ in self.top(settings.HOT_AUCTION_TOP_K, now)
+                if self.rate(estimate, now) >= settings.HOT_AUCTION_MIN_RATE
+            }
+            self._hot_at = now
+        return key in self._hot
+
+    def tracked_keys(self) -> int:
+        with self._lock:
+            return sum(len(summary.counts) for _, summary in self._ring)
+
+    def _bucket(self, now: float) -> SpaceSaving:
+        index = int(now // self._span)
+        if self._started is None:
+            self._started = index * self._span
+        if not self._ring or self._ring[-1][0] != index:
+            self._ring.append((index, SpaceSaving(self.capacity)))
+        self._expire(now)
+        return self._ring[-1][1]
+
+    def _expire(self, now: float) -> None:
+        oldest = int(now // self._span) - self.buckets
+        while self._ring and self._ring[0][0] <= oldest:
+            self._ring.popleft()
+
+
+# Bid traffic per auction as seen by this process (API: Pub/Sub listener, worker: Kafka consumer)
+hot_auctions = HotKeyTracker(
+    window_seconds=settings.HOT_AUCTION_WINDOW_SECONDS,
+    buckets=settings.HOT_AUCTION_BUCKETS,
+    capacity=settings.HOT_AUCTION_CAPACITY,
+)
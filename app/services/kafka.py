@@ -1,12 +1,50 @@
 # app/services/kafka.py
 import json
+import uuid
 import asyncio
-from aiokafka import AIOKafkaProducer, AIOKafkaConsumer
+from collections import Counter
+from datetime import datetime, timezone
+from aiokafka import AIOKafkaProducer, AIOKafkaConsumer, TopicPartition
+from aiokafka.abc import ConsumerRebalanceListener
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import update
+from sqlalchemy import select, update, func, case
 from app.core.config import settings
-from app.db.session import AsyncSessionLocal
-from app.db.models import Auction, Bid
+from app.core.ids import uuid7
+from app.db.session import get_sessionmaker
+from app.db.models import Auction, Bid, AuctionStats, AuctionBidder, ConsumerOffset
+from app.services.hot_keys import hot_auctions
+
+class StaleOffsetError(Exception):
+    """Raised when a batch starts behind the offset already stored for its partition."""
+
+
+def parse_bid(value) -> dict:
+    """
+    Validate one consumed bid record and return it with ``bid_id`` converted to a UUID.
+    Raises ValueError for a malformed record, which the caller skips: retrying cannot fix it, and
+    in exactly-once mode a failing batch is retried forever, stalling its partition.
+    """
+    if not isinstance(value, dict):
+        raise ValueError("record is not a JSON object")
+    try:
+        bid_id = uuid.UUID(str(value["bid_id"]))
+    except (KeyError, ValueError) as e:
+        raise ValueError(f"missing or malformed bid_id: {e}") from None
+    for field in ("user_id", "auction_id", "amount"):
+        if type(value.get(field)) is not int:
+            raise ValueError(f"{field} is missing or not an integer")
+    if value.get("ends_at") is not None and type(value["ends_at"]) is not int:
+        raise ValueError("ends_at is not an integer")
+    return {**value, "bid_id": bid_id}
+
+
+def _deserialize(raw: bytes):
+    # Invalid JSON becomes None, which parse_bid rejects; raising here would fail getmany() for the whole fetch
+    try:
+        return json.loads(raw.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+
 
 class KafkaService:
     """Manages Kafka producer and consumer for the auction system."""
@@ -28,6 +66,8 @@ class KafkaService:
     @classmethod
     async def publish_bid(cls, bid_data: dict) -> None:
         producer = await cls.get_producer()
+        # Time-ordered ids keep the bid_id index append-only (same scheme as the Go producer)
+        bid_data.setdefault("bid_id", str(uuid7()))
         try:
             await producer.send_and_wait(
                 settings.KAFKA_BID_TOPIC,
@@ -40,15 +80,22 @@ class KafkaService:
     async def get_consumer(cls) -> AIOKafkaConsumer:
         if cls._consumer is None:
             cls._consumer = AIOKafkaConsumer(
-                settings.KAFKA_BID_TOPIC,
                 bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
-                group_id="auction-processor",
-                value_deserializer=lambda m: json.loads(m.decode('utf-8')),
+                group_id=settings.KAFKA_CONSUMER_GROUP,
+                value_deserializer=_deserialize,
                 auto_offset_reset='earliest',
                 enable_auto_commit=False 
             )
+            if settings.KAFKA_EXACTLY_ONCE:
+                # Positions come from Postgres, not from the group's committed offsets
+                cls._consumer.subscribe(
+                    [settings.KAFKA_BID_TOPIC], listener=DbOffsetRebalanceListener(cls._consumer)
+                )
+            else:
+                cls._consumer.subscribe([settings.KAFKA_BID_TOPIC])
             await cls._consumer.start()
-            print("✅ Kafka Consumer Started")
+            mode = "exactly-once, offsets in Postgres" if settings.KAFKA_EXACTLY_ONCE else "at-least-once"
+            print(f"✅ Kafka Consumer Started ({mode})")
         return cls._consumer
     
     @classmethod
@@ -59,6 +106,87 @@ class KafkaService:
             await cls._consumer.stop()
 
 
+class DbOffsetRebalanceListener(ConsumerRebalanceListener):
+    """Seeks newly assigned partitions to the offsets stored in consumer_offsets."""
+
+    def __init__(self, consumer: AIOKafkaConsumer):
+        self.consumer = consumer
+
+    async def on_partitions_revoked(self, revoked):
+        pass  # Offsets are stored with every batch; there is nothing to flush
+
+    async def on_partitions_assigned(self, assigned):
+        await seek_to_stored_offsets(self.consumer, assigned)
+
+
+async def load_stored_offsets(partitions) -> dict:
+    """Return {TopicPartition: next_offset} for the partitions that have a stored position."""
+    partitions = list(partitions)
+    if not partitions:
+        return {}
+    async with get_sessionmaker()() as session:
+        result = await session.execute(
+            select(ConsumerOffset.topic, ConsumerOffset.partition, ConsumerOffset.next_offset)
+            .where(
+                ConsumerOffset.group_id == settings.KAFKA_CONSUMER_GROUP,
+                ConsumerOffset.topic.in_({tp.topic for tp in partitions}),
+            )
+        )
+        stored = {TopicPartition(topic, partition): offset for topic, partition, offset in result}
+    return {tp: stored[tp] for tp in partitions if tp in stored}
+
+
+async def seek_to_stored_offsets(consumer: AIOKafkaConsumer, partitions) -> None:
+    # Partitions without a stored offset keep the default position (committed offset / auto_offset_reset)
+    stored = await load_stored_offsets(partitions)
+    for tp, offset in stored.items():
+        consumer.seek(tp, offset)
+    if stored:
+        print(f"⏩ Resumed {len(stored)} partition(s) from stored offsets: "
+              f"{ {tp.partition: offset for tp, offset in stored.items()} }")
+
+
+async def store_offsets(session, offsets: dict) -> None:
+    """
+    Upsert {TopicPartition: (first_offset, next_offset)} inside the caller's transaction.
+    The update is fenced: it only applies if the stored position is not past this batch's first offset.
+    A consumer that lost its partition in a rebalance but still flushes an old batch is rejected.
+    """
+    for tp, (first_offset, next_offset) in sorted(offsets.items()):
+        stmt = insert(ConsumerOffset).values(
+            group_id=settings.KAFKA_CONSUMER_GROUP,
+            topic=tp.topic,
+            partition=tp.partition,
+            next_offset=next_offset,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ConsumerOffset.group_id, ConsumerOffset.topic, ConsumerOffset.partition],
+            set_={"next_offset": stmt.excluded.next_offset, "updated_at": func.now()},
+            where=ConsumerOffset.next_offset <= first_offset,
+        ).returning(ConsumerOffset.partition)
+        if (await session.execute(stmt)).first() is None:
+            raise StaleOffsetError(
+                f"{tp.topic}[{tp.partition}] already stored past offset {first_offset}; batch was processed before"
+            )
+
+
+async def rewind_batch(consumer: AIOKafkaConsumer, offsets: dict) -> None:
+    """
+    Seek every partition of a failed batch back so the batch is retried, not skipped.
+    A stored position wins over the batch's first offset (it is ahead after a StaleOffsetError).
+    Partitions with no stored row yet go back to the first offset of the batch.
+    """
+    try:
+        stored = await load_stored_offsets(offsets)
+    except Exception as e:
+        print(f"❌ [Consumer Error] Failed to load stored offsets, rewinding to batch start: {e}")
+        stored = {}
+    assigned = consumer.assignment()
+    for tp, (first_offset, _) in offsets.items():
+        if tp in assigned:  # A partition lost in a rebalance is re-seeked by the listener of its new owner
+            consumer.seek(tp, stored.get(tp, first_offset))
+
+
 async def consume_and_save_bids():
     """
     Consumer that listens to Kafka bids topic and saves them to the database in BATCHES.
@@ -66,6 +194,7 @@ async def consume_and_save_bids():
     consumer = await KafkaService.get_consumer()
     
     while True:
+        offsets = {}
         try:
             # 1: Wait up to 1 second (1000ms), or fetch once when 1000 messages are buffered.
             batch_data = await consumer.getmany(timeout_ms=1000, max_records=1000)
@@ -77,30 +206,50 @@ async def consume_and_save_bids():
             bids_to_process = []
             for tp, messages in batch_data.items():
                 for message in messages:
-                    bids_to_process.append(message.value)
+                    try:
+                        bids_to_process.append(parse_bid(message.value))
+                    except ValueError as e:
+                        # Skipped, not retried; its offset is still covered by this batch
+                        print(f"⚠️  [Consumer] Skipping malformed bid at {tp.topic}[{tp.partition}]@{message.offset}: "
+                              f"{e} ({message.value!r})")
+                if messages:
+                    offsets[tp] = (messages[0].offset, messages[-1].offset + 1)
 
             if bids_to_process:
                 print(f"📦 [Batch Processing] Received {len(bids_to_process)} bids in this window.")
-                await save_bids_batch_to_db(bids_to_process)
-                await consumer.commit()  # Manual commit: commit offsets only after successful batch processing.
+                await save_bids_batch_to_db(
+                    bids_to_process, offsets if settings.KAFKA_EXACTLY_ONCE else None
+                )
+                # Feed the heavy-hitter sketch once the batch is saved, so a failed and retried batch counts once
+                hot_auctions.record_many(Counter(b["auction_id"] for b in bids_to_process))
+                # Manual commit: commit offsets only after successful batch processing.
+                # (In exactly-once mode Postgres is the source of truth; this only keeps lag metrics current.)
+                await consumer.commit()
         except asyncio.CancelledError:
             print("🛑 Bid consumer cancelled")
             raise
         except Exception as e:
             print(f"❌ [Consumer Error] {e}")
+            if settings.KAFKA_EXACTLY_ONCE and offsets:
+                # Rewind every partition of the failed batch so it is retried, not skipped
+                try:
+                    await rewind_batch(consumer, offsets)
+                except Exception as seek_error:
+                    print(f"❌ [Consumer Error] Failed to rewind the batch: {seek_error}")
             continue  # Keep consuming subsequent messages even if an error occurs.
 
 
-async def save_bids_batch_to_db(bids: list[dict]):
+async def save_bids_batch_to_db(bids: list[dict], offsets: dict = None):
     """
-    Persist a batch of bids to the database efficiently.
+    Persist a batch of bids (validated by parse_bid) to the database efficiently.
+    With ``offsets`` ({TopicPartition: (first_offset, next_offset)}), the consumer position is stored in the same transaction.
     """
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         try:
             # 1) Prepare bulk insert.
             insert_values = [
                 {
-                    "bid_id": b["bid_id"], # UUID used for idempotency protection.
+                    "bid_id": b["bid_id"], # UUIDv7 used for idempotency protection (validated by parse_bid).
                     "user_id": b["user_id"],
                     "auction_id": b["auction_id"],
                     "price": b["amount"]
@@ -109,34 +258,116 @@ async def save_bids_batch_to_db(bids: list[dict]):
             ]
 
             # 2) Insert up to 1000 bids with a single query (including idempotency safeguard).
+            #    RETURNING yields only the rows actually inserted, so redelivered bids are never counted twice.
+            #    No conflict target: at-least-once mode dedups through the unique bid_id index. In exactly-once mode
+            #    the stored offsets prevent redelivery, and the index may be dropped (then this is a plain insert).
             stmt = insert(Bid).values(insert_values)
-            stmt = stmt.on_conflict_do_nothing(index_elements=['bid_id'])
-            await session.execute(stmt)
+            stmt = stmt.on_conflict_do_nothing()
+            stmt = stmt.returning(Bid.auction_id, Bid.user_id, Bid.price, Bid.created_at)
+            inserted = (await session.execute(stmt)).all()
 
-            # 3) Compute the highest bid per auction in Python memory.
+            # 3) Compute the highest bid (and latest anti-sniping extension) per auction in Python memory.
             auction_max_prices = {}
+            auction_ends_at = {}
             for b in bids:
                 aid = b["auction_id"]
                 amt = b["amount"]
                 # Update only when the new amount is higher than the current max.
                 if aid not in auction_max_prices or amt > auction_max_prices[aid]:
                     auction_max_prices[aid] = amt
+                # Bids that extended the deadline carry the new end time (unix ms).
+                if b.get("ends_at") and b["ends_at"] > auction_ends_at.get(aid, 0):
+                    auction_ends_at[aid] = b["ends_at"]
 
             # 4) Update each auction only with the final max amount.
             # (Even with 1000 bids, only one UPDATE is issued if they belong to one auction.)
             for aid, max_amt in auction_max_prices.items():
+                values = {"current_price": max_amt}
+                if aid in auction_ends_at:
+                    extended = datetime.fromtimestamp(auction_ends_at[aid] / 1000, tz=timezone.utc)
+                    values["ends_at"] = func.greatest(Auction.ends_at, extended)
                 update_stmt = (
                     update(Auction)
                     .where(Auction.id == aid)
-                    .values(current_price=max_amt)
+                    .values(**values)
                 )
                 await session.execute(update_stmt)
 
-            # 5) Commit the transaction in one batch.
+            # 5) Fold the newly inserted bids into the per-auction aggregates (same transaction).
+            if inserted:
+                await update_auction_stats(session, inserted)
+
+            # 6) Advance the stored consumer position atomically with the data (exactly-once mode).
+            if offsets:
+                await store_offsets(session, offsets)
+
+            # 7) Commit the transaction in one batch.
             await session.commit()
             print(f"✅ [Batch DB Saved] Successfully inserted bids and updated {len(auction_max_prices)} auctions.")
 
         except Exception as e:
             await session.rollback()
             print(f"❌ [DB Error] Failed to save batch: {e}")
-            raise
\ No newline at end of file
+            raise
+
+
+async def update_auction_stats(session, inserted: list) -> None:
+    """
+    Upsert auction_stats once per auction from the (auction_id, user_id, price, created_at) rows of a batch.
+    """
+    # 1) Aggregate the batch in memory.
+    batch = {}
+    for auction_id, user_id, price, created_at in inserted:
+        stats = batch.get(auction_id)
+        if stats is None:
+            stats = batch[auction_id] = {
+                "auction_id": auction_id,
+                "bid_count": 0,
+                "unique_bidders": 0,
+                "leader_user_id": user_id,
+                "leader_price": price,
+                "last_bid_at": created_at,
+                "price_velocity": 0.0,
+            }
+        stats["bid_count"] += 1
+        if price > stats["leader_price"]:
+            stats["leader_price"], stats["leader_user_id"] = price, user_id
+        stats["last_bid_at"] = max(stats["last_bid_at"], created_at)
+
+    # 2) Record (auction, bidder) pairs; only pairs never seen before come back, i.e. new unique bidders.
+    pairs = sorted({(auction_id, user_id) for auction_id, user_id, _, _ in inserted})
+    bidders_stmt = (
+        insert(AuctionBidder)
+        .values([{"auction_id": aid, "user_id": uid} for aid, uid in pairs])
+        .on_conflict_do_nothing()
+        .returning(AuctionBidder.auction_id)
+    )
+    for (auction_id,) in await session.execute(bidders_stmt):
+        batch[auction_id]["unique_bidders"] += 1
+
+    # 3) One multi-row upsert, merged with the stored row in SQL.
+    #    Rows are sorted by auction_id so concurrent workers lock them in the same order.
+    stmt = insert(AuctionStats).values([batch[aid] for aid in sorted(batch)])
+    new = stmt.excluded
+    elapsed = func.extract("epoch", new.last_bid_at - AuctionStats.last_bid_at)
+    # Price velocity: EWMA of (price increase / seconds since the previous batch for this auction)
+    alpha = settings.AUCTION_STATS_VELOCITY_ALPHA
+    sample = func.greatest(new.leader_price - AuctionStats.leader_price, 0) / elapsed
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AuctionStats.auction_id],
+        set_={
+            "bid_count": AuctionStats.bid_count + new.bid_count,
+            "unique_bidders": AuctionStats.unique_bidders + new.unique_bidders,
+            "leader_user_id": case(
+                (new.leader_price > AuctionStats.leader_price, new.leader_user_id),
+                else_=AuctionStats.leader_user_id,
+            ),
+            "leader_price": func.greatest(AuctionStats.leader_price, new.leader_price),
+            "last_bid_at": func.greatest(AuctionStats.last_bid_at, new.last_bid_at),
+            "price_velocity": case(
+                (elapsed > 0, alpha * sample + (1 - alpha) * AuctionStats.price_velocity),
+                else_=AuctionStats.price_velocity,
+            ),
+        },
+    )
+    await session.execute(stmt)
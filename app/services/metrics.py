@@ -0,0 +1,49 @@
+from typing import Iterator
+
+from prometheus_client import REGISTRY, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from app.core.config import settings
+from app.services.hot_keys import HotKeyTracker, hot_auctions
+
+
+class HotAuctionCollector(Collector):
+    """Exports the current top-k hot auctions at scrape time.
+
+    Only the top ``HOT_AUCTION_TOP_K`` auctions get a series, so label cardinality
+    stays bounded however many auctions exist.
+    """
+
+    def __init__(self, tracker: HotKeyTracker, source: str):
+        self.tracker = tracker
+        self.source = source
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        rate = GaugeMetricFamily(
+            "auction_hot_bid_rate",
+            f"Bids per second over the last {settings.HOT_AUCTION_WINDOW_SECONDS:.0f}s for the hottest auctions",
+            labels=["source", "auction_id"],
+        )
+        for auction_id, estimate, _ in self.tracker.top(settings.HOT_AUCTION_TOP_K):
+            rate.add_metric([self.source, str(auction_id)], self.tracker.rate(estimate))
+        yield rate
+
+        tracked = GaugeMetricFamily(
+            "auction_hot_tracked_keys",
+            "Counters held by the heavy-hitter sketch (bounded by buckets x capacity)",
+            labels=["source"],
+        )
+        tracked.add_metric([self.source], self.tracker.tracked_keys())
+        yield tracked
+
+
+def register_hot_auction_metrics(source: str) -> None:
+    """Register the hot-auction collector on the default registry (once per process)."""
+    REGISTRY.register(HotAuctionCollector(hot_auctions, source))
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve /metrics from a background thread (for processes without an HTTP server)."""
+    start_http_server(port)
+    print(f"📈 Metrics exporter listening on :{port}/metrics")
@@ -0,0 +1,30 @@
+import redis.asyncio as redis
+from app.core.config import settings
+
+
+class RedisService:
+    """Manages the process-wide Redis client, created on first use."""
+
+    _client: redis.Redis = None
+
+    @classmethod
+    def get_client(cls) -> redis.Redis:
+        if cls._client is None:
+            cls._client = redis.from_url(settings.REDIS_URL)
+        return cls._client
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+
+# Key layout shared with the Go bid service (bid-service/internal/api/handlers.go)
+def auction_price_key(auction_id: int) -> str:
+    return f"auction:{auction_id}:price"
+
+
+def auction_ends_at_key(auction_id: int) -> str:
+    # Closing time in unix milliseconds; the bid Lua script rejects bids at or after it
+    return f"auction:{auction_id}:ends_at"
@@ -0,0 +1,252 @@
+import json
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+
+from aiokafka import AIOKafkaConsumer, TopicPartition
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.config import settings
+from app.services.kafka import parse_bid, update_auction_stats
+from app.services.redis import RedisService, auction_ends_at_key, auction_price_key
+
+STAGING_TABLE = "replay_bids"
+STAGING_COLUMNS = ("bid_id", "user_id", "auction_id", "price", "created_at", "ends_at")
+
+# A valid single-column unique index on bids.bid_id (ix_bids_bid_id); the replay's dedup depends on it
+DEDUP_INDEX_QUERY = """
+SELECT 1
+FROM pg_index i
+JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+WHERE i.indrelid = 'bids'::regclass AND i.indisunique AND i.indisvalid AND i.indnatts = 1 AND a.attname = 'bid_id'
+"""
+
+# Only ever raise a cached value: live bids may already have moved the key past what the DB holds
+REDIS_MAX_SCRIPT = """
+local current = redis.call('get', KEYS[1])
+if not current or tonumber(ARGV[1]) > tonumber(current) then
+    redis.call('set', KEYS[1], ARGV[1])
+end
+"""
+
+
+class BidReplayer:
+    """Rebuilds bids, auction prices/deadlines, auction_stats and the Redis cache from the bid topic.
+
+    Unlike the live worker (1000 records per 1s window, shared consumer group), the replay:
+
+    - assigns every partition manually under its own group, so the live group's offsets are never touched
+    - stops at the end offsets captured at startup instead of tailing the topic
+    - fetches large batches and writes each one with COPY into a temp staging table, followed by one
+      set-based INSERT ... SELECT and one UPDATE of auctions (no per-row statements, no SQL echo)
+    - rebuilds Redis with pipelined max-merge writes at the end
+
+    Bids that already exist are skipped through the unique index on ``bid_id``.
+    Exactly-once deployments may drop that index (see README). Without it every
+    replayed bid would be inserted and counted in auction_stats a second time,
+    so ``run`` refuses to start until the index is back.
+    """
+
+    def __init__(self, batch_size: int = settings.REPLAY_BATCH_SIZE, group_id: str = settings.REPLAY_CONSUMER_GROUP):
+        self.batch_size = batch_size
+        self.group_id = group_id
+        self.engine = create_async_engine(settings.DATABASE_URL)  # echo off: no per-statement logging
+        self.consumer = AIOKafkaConsumer(
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+            group_id=group_id,
+            enable_auto_commit=False,
+            auto_offset_reset="earliest",
+            fetch_max_bytes=64 * 1024 * 1024,
+            max_partition_fetch_bytes=16 * 1024 * 1024,
+        )
+        self.end_offsets: Dict[TopicPartition, int] = {}
+        self.touched_auctions: Set[int] = set()
+        self.records = 0
+        self.inserted = 0
+        self.skipped = 0
+
+    async def assign(self, from_offset: Optional[int] = None, from_timestamp: Optional[datetime] = None,
+                     resume: bool = False) -> None:
+        """Assign all partitions of the bid topic and seek to the requested start position."""
+        await self.consumer.start()
+        await self.consumer.topics()  # Refresh metadata so the partition list is known
+        partitions = [
+            TopicPartition(settings.KAFKA_BID_TOPIC, p)
+            for p in sorted(self.consumer.partitions_for_topic(settings.KAFKA_BID_TOPIC) or ())
+        ]
+        if not partitions:
+            raise RuntimeError(f"Topic {settings.KAFKA_BID_TOPIC!r} has no partitions")
+        self.consumer.assign(partitions)
+        self.end_offsets = await self.consumer.end_offsets(partitions)
+
+        if from_timestamp is not None:
+            found = await self.consumer.offsets_for_times(
+                {tp: int(from_timestamp.timestamp() * 1000) for tp in partitions}
+            )
+            for tp in partitions:
+                # None: no record at or after the timestamp, so there is nothing to replay for this partition
+                self.consumer.seek(tp, found[tp].offset if found[tp] else self.end_offsets[tp])
+        elif from_offset is not None:
+            for tp in partitions:
+                self.consumer.seek(tp, from_offset)
+        elif resume:
+            for tp in partitions:
+                committed = await self.consumer.committed(tp)
+                if committed is not None:
+                    self.consumer.seek(tp, committed)
+                else:
+                    await self.consumer.seek_to_beginning(tp)
+        else:
+            await self.consumer.seek_to_beginning(*partitions)
+
+    async def remaining(self) -> int:
+        total = 0
+        for tp, end in self.end_offsets.items():
+            total += max(0, end - await self.consumer.position(tp))
+        return total
+
+    async def check_dedup_index(self) -> None:
+        async with self.engine.connect() as conn:
+            if await conn.scalar(text(DEDUP_INDEX_QUERY)) is None:
+                raise RuntimeError(
+                    "bids has no unique index on bid_id, so a replay would duplicate existing bids. Recreate it "
+                    "first: CREATE UNIQUE INDEX CONCURRENTLY ix_bids_bid_id ON bids (bid_id)"
+                )
+
+    async def run(self, rebuild_redis: bool = True) -> None:
+        await self.check_dedup_index()
+        pending = {tp for tp, end in self.end_offsets.items() if await self.consumer.position(tp) < end}
+        total = await self.remaining()
+        print(f"⏪ Replaying {total} records from {len(pending)} partition(s) of '{settings.KAFKA_BID_TOPIC}' "
+              f"(group '{self.group_id}', batch {self.batch_size})")
+
+        start = last_report = time.perf_counter()
+        async with self.engine.connect() as conn:
+            await conn.exec_driver_sql(
+                f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ("
+                " bid_id UUID, user_id INTEGER, auction_id INTEGER, price INTEGER,"
+                " created_at TIMESTAMP WITH TIME ZONE, ends_at TIMESTAMP WITH TIME ZONE)"
+            )
+            await conn.commit()
+
+            while pending:
+                batch = await self.consumer.getmany(*pending, timeout_ms=1000, max_records=self.batch_size)
+                rows = []
+                for tp, messages in batch.items():
+                    end = self.end_offsets[tp]
+                    for message in messages:
+                        if message.offset >= end:
+                            break  # Past the snapshot: the live worker owns these
+                        self.records += 1
+                        try:
+                            rows.append(self._to_row(parse_bid(json.loads(message.value)), message.timestamp))
+                        except ValueError as e:  # JSONDecodeError included; one bad record must not stop the replay
+                            self.skipped += 1
+                            print(f"⚠️  Skipping malformed bid at {tp.topic}[{tp.partition}]@{message.offset}: {e}")
+                for tp in list(pending):
+                    if await self.consumer.position(tp) >= self.end_offsets[tp]:
+                        pending.discard(tp)
+
+                if rows:
+                    await self._write(conn, rows)
+                    # Progress of this replay group (used by --resume); the live group is untouched
+                    await self.consumer.commit({
+                        tp: min(messages[-1].offset + 1, self.end_offsets[tp])
+                        for tp, messages in batch.items() if messages
+                    })
+
+                now = time.perf_counter()
+                if now - last_report >= settings.REPLAY_PROGRESS_INTERVAL_SECONDS or not pending:
+                    elapsed = now - start
+                    print(f"⏩ {self.records}/{total} records ({self.records / max(total, 1) * 100:5.1f}%), "
+                          f"{self.inserted} new bids, {self.records / max(elapsed, 1e-9):,.0f} records/s")
+                    last_report = now
+
+        elapsed = time.perf_counter() - start
+        print(f"✅ Replayed {self.records} records in {elapsed:.1f}s "
+              f"({self.records / max(elapsed, 1e-9):,.0f} records/s); {self.inserted} bids were missing and restored, "
+              f"{len(self.touched_auctions)} auctions updated, {self.skipped} malformed records skipped.")
+
+        if rebuild_redis:
+            await self.rebuild_redis()
+
+    @staticmethod
+    def _to_row(bid: dict, timestamp_ms: int) -> tuple:
+        # The Kafka record timestamp is when the bid was accepted; better than now() for created_at
+        ends_at = bid.get("ends_at")
+        return (
+            bid["bid_id"],
+            bid["user_id"],
+            bid["auction_id"],
+            bid["amount"],
+            datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc),
+            datetime.fromtimestamp(ends_at / 1000, tz=timezone.utc) if ends_at else None,
+        )
+
+    async def _write(self, conn: AsyncConnection, rows: list) -> None:
+        """COPY one batch into staging and apply it with set-based statements in one transaction."""
+        async with conn.begin():
+            # Issued through SQLAlchemy first so the driver has opened the transaction before the raw COPY
+            await conn.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(STAGING_TABLE, records=rows, columns=STAGING_COLUMNS)
+
+            # 1) Bids: existing rows (same bid_id) are skipped by ix_bids_bid_id (checked in run), so replaying
+            #    over live data is safe
+            inserted = (await conn.execute(text(
+                f"INSERT INTO bids (bid_id, user_id, auction_id, price, created_at) "
+                f"SELECT bid_id, user_id, auction_id, price, created_at FROM {STAGING_TABLE} "
+                "ON CONFLICT DO NOTHING "
+                "RETURNING auction_id, user_id, price, created_at"
+            ))).all()
+
+            # 2) Auctions: highest price and latest anti-sniping deadline per auction, one statement
+            touched = await conn.execute(text(
+                "UPDATE auctions a "
+                "SET current_price = GREATEST(a.current_price, r.max_price), "
+                "    ends_at = GREATEST(a.ends_at, r.max_ends_at) "
+                f"FROM (SELECT auction_id, max(price) AS max_price, max(ends_at) AS max_ends_at "
+                f"      FROM {STAGING_TABLE} GROUP BY auction_id) r "
+                "WHERE a.id = r.auction_id "
+                "RETURNING a.id"
+            ))
+            self.touched_auctions.update(row[0] for row in touched)
+
+            # 3) Aggregates for the bids that were actually restored
+            if inserted:
+                await update_auction_stats(conn, inserted)
+        self.inserted += len(inserted)
+
+    async def rebuild_redis(self, chunk_size: int = 10_000) -> None:
+        """Re-seed price and deadline keys of every replayed auction with pipelined writes."""
+        if not self.touched_auctions:
+            return
+        redis = RedisService.get_client()
+        raise_to = redis.register_script(REDIS_MAX_SCRIPT)
+        auction_ids = sorted(self.touched_auctions)
+        start = time.perf_counter()
+
+        async with self.engine.connect() as conn:
+            for i in range(0, len(auction_ids), chunk_size):
+                chunk = auction_ids[i:i + chunk_size]
+                result = await conn.execute(
+                    text("SELECT id, current_price, ends_at FROM auctions WHERE id = ANY(:ids)"),
+                    {"ids": chunk},
+                )
+                async with redis.pipeline(transaction=False) as pipe:
+                    for auction_id, price, ends_at in result:
+                        await raise_to(keys=[auction_price_key(auction_id)], args=[price], client=pipe)
+                        if ends_at is not None:
+                            await raise_to(
+                                keys=[auction_ends_at_key(auction_id)],
+                                args=[int(ends_at.timestamp() * 1000)],
+                                client=pipe,
+                            )
+                    await pipe.execute()
+
+        print(f"✅ Rebuilt Redis keys for {len(auction_ids)} auctions in {time.perf_counter() - start:.1f}s")
+
+    async def close(self) -> None:
+        await self.consumer.stop()
+        await self.engine.dispose()
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from sqlalchemy import select, update, func
+from app.core.config import settings
+from app.db.session import get_sessionmaker
+from app.db.models import Auction, AUCTION_OPEN, AUCTION_CLOSED
+from app.services.redis import RedisService, auction_ends_at_key, auction_price_key
+from app.services.timing_wheel import TimingWheel
+
+
+class AuctionCloser:
+    """Closes auctions when their deadline passes.
+
+    Deadlines live in a TimingWheel, so scheduling, anti-sniping extensions and
+    closing cost O(1) per auction no matter how many auctions are live. The
+    authoritative deadline is the Redis key checked by the bid Lua script.
+    Before closing, the scheduler re-reads that key in one pipeline per batch,
+    which covers any extension whose Pub/Sub notice was missed. It compares it
+    against Redis TIME, the clock the script uses, not its own. Once the
+    deadline has passed the script rejects every bid, so the key can no longer
+    change and closing is race-free.
+
+    New auctions are picked up by walking the primary key forward. Sequence
+    values are not committed in order, so a slow insert (e.g. a large
+    /auctions/bulk) can become visible below the cursor. A periodic sweep of
+    open auctions that are already past their deadline catches those, along
+    with any auction created while the closer was starting. It is a range scan
+    of the partial ``ix_auctions_open_ends_at`` index.
+    """
+
+    def __init__(self):
+        self.wheel = TimingWheel(tick=settings.SCHEDULER_TICK_SECONDS, start=time.time())
+        self._last_seen_auction_id = 0
+
+    async def load_open_auctions(self):
+        """Schedule every open auction with a deadline (partial index scan, startup only)."""
+        async with get_sessionmaker()() as session:
+            result = await session.stream(
+                select(Auction.id, Auction.ends_at)
+                .where(Auction.status == AUCTION_OPEN, Auction.ends_at.is_not(None))
+            )
+            async for auction_id, ends_at in result:
+                self.wheel.schedule(auction_id, ends_at.timestamp())
+            max_id = await session.scalar(select(func.max(Auction.id)))
+        self._last_seen_auction_id = max_id or 0
+        print(f"⏰ Scheduled {len(self.wheel)} open auctions (cursor at id {self._last_seen_auction_id})")
+
+    async def load_new_auctions(self):
+        """Pick up auctions created since the last poll, walking the primary key forward."""
+        async with get_sessionmaker()() as session:
+            result = await session.execute(
+                select(Auction.id, Auction.ends_at, Auction.status)
+                .where(Auction.id > self._last_seen_auction_id)
+                .order_by(Auction.id)
+            )
+            for auction_id, ends_at, status in result:
+                self._last_seen_auction_id = auction_id
+                if status == AUCTION_OPEN and ends_at is not None:
+                    self.wheel.schedule(auction_id, ends_at.timestamp())
+
+    async def load_overdue_auctions(self) -> int:
+        """Schedule open auctions past their deadline that the wheel does not hold (missed by the cursor)."""
+        async with get_sessionmaker()() as session:
+            result = await session.execute(
+                select(Auction.id, Auction.ends_at)
+                .where(Auction.status == AUCTION_OPEN, Auction.ends_at.is_not(None), Auction.ends_at <= func.now())
+            )
+            missed = 0
+            for auction_id, ends_at in result:
+                if auction_id not in self.wheel:
+                    self.wheel.schedule(auction_id, ends_at.timestamp())
+                    missed += 1
+        if missed:
+            print(f"⏰ [Closer] Recovered {missed} overdue auctions missed by the id cursor")
+        return missed
+
+    def extend(self, auction_id: int, ends_at_ms: int):
+        """Apply an anti-sniping extension (O(1) reschedule)."""
+        self.wheel.schedule(auction_id, ends_at_ms / 1000)
+
+    async def close_due(self, now: float):
+        due = self.wheel.advance(now)
+        for i in range(0, len(due), settings.SCHEDULER_BATCH_SIZE):
+            batch = due[i:i + settings.SCHEDULER_BATCH_SIZE]
+            try:
+                await self.close_batch(batch)
+            except Exception as e:
+                print(f"❌ [Closer Error] Failed to close batch, retrying: {e}")
+                for aid in batch:
+                    if aid not in self.wheel:
+                        self.wheel.schedule(aid, now + settings.SCHEDULER_POLL_INTERVAL_SECONDS)
+
+    async def close_batch(self, auction_ids: list[int]):
+        redis = RedisService.get_client()
+
+        # 1) Re-check the authoritative deadlines and read the final prices in one round trip.
+        #    "Now" is Redis TIME, the same clock the bid Lua script checks, so the closer's own
+        #    clock skew cannot close an auction that Redis still accepts bids for.
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.time()
+            for aid in auction_ids:
+                pipe.get(auction_ends_at_key(aid))
+                pipe.get(auction_price_key(aid))
+            redis_time, *values = await pipe.execute()
+
+        now_ms = redis_time[0] * 1000 + redis_time[1] // 1000
+        redis_prices = {}
+        for aid, ends_at, price in zip(auction_ids, values[0::2], values[1::2]):
+            if ends_at is not None and int(ends_at) > now_ms:
+                self.extend(aid, int(ends_at))  # Extended by a late bid
+                continue
+            redis_prices[aid] = int(price) if price is not None else None
+        if not redis_prices:
+            return
+
+        # 2) Close the whole batch in one statement. Only rows that are still open come back,
+        #    so a restarted or duplicate closer never announces the same auction twice.
+        async with get_sessionmaker()() as session:
+            result = await session.execute(
+                update(Auction)
+                .where(Auction.id.in_(list(redis_prices)), Auction.status == AUCTION_OPEN)
+                .values(status=AUCTION_CLOSED)
+                .returning(Auction.id, Auction.current_price, Auction.ends_at)
+            )
+            closed = result.all()
+            await session.commit()
+
+        # 3) Pin the deadline in Redis (the key may have been evicted) and notify viewers
+        async with redis.pipeline(transaction=False) as pipe:
+            for aid, db_price, ends_at in closed:
+                # The DB price may lag the write-behind worker; Redis holds the latest accepted bid
+                final_price = max(db_price, redis_prices[aid] or 0)
+                ends_at = ends_at or datetime.now(timezone.utc)
+                pipe.set(auction_ends_at_key(aid), int(ends_at.timestamp() * 1000), nx=True)
+                pipe.publish("auction_channel", json.dumps({
+                    "type": "auction_closed",
+                    "auction_id": aid,
+                    "final_price": final_price,
+                    "ends_at": int(ends_at.timestamp() * 1000),
+                }))
+            await pipe.execute()
+        print(f"🔨 [Closer] Closed {len(closed)} auctions.")
+
+    async def listen_for_extensions(self):
+        """Follow anti-sniping extensions announced with accepted bids on the Pub/Sub channel."""
+        async with RedisService.get_client().pubsub() as pubsub:
+            await pubsub.subscribe("auction_channel")
+            async for message in pubsub.listen():
+                if message["type"] != "message" or b'"ends_at"' not in message["data"]:
+                    continue  # Cheap filter: most messages are plain bids
+                try:
+                    data = json.loads(message["data"])
+                except json.JSONDecodeError:
+                    continue
+                if data.get("type") == "auction_closed":
+                    self.wheel.cancel(data["auction_id"])
+                elif data.get("auction_id") and data.get("ends_at"):
+                    self.extend(int(data["auction_id"]), int(data["ends_at"]))
+
+    async def run(self):
+        await self.load_open_auctions()
+        listener = asyncio.create_task(self.listen_for_extensions())
+        next_poll = time.monotonic() + settings.SCHEDULER_POLL_INTERVAL_SECONDS
+        next_sweep = time.monotonic() + settings.SCHEDULER_SWEEP_INTERVAL_SECONDS
+        try:
+            while True:
+                try:
+                    await self.close_due(time.time())
+                    if time.monotonic() >= next_poll:
+                        await self.load_new_auctions()
+                        next_poll = time.monotonic() + settings.SCHEDULER_POLL_INTERVAL_SECONDS
+                    if time.monotonic() >= next_sweep:
+                        await self.load_overdue_auctions()
+                        next_sweep = time.monotonic() + settings.SCHEDULER_SWEEP_INTERVAL_SECONDS
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"❌ [Closer Error] {e}")
+                await asyncio.sleep(settings.SCHEDULER_TICK_SECONDS)
+        finally:
+            listener.cancel()
@@ -0,0 +1,110 @@
+import math
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+
+class TimingWheel:
+    """Hierarchical timing wheel (Varghese & Lauck) for very many deadlines.
+
+    ``schedule``, ``cancel`` and rescheduling an existing key are O(1), and
+    ``advance`` costs O(ticks elapsed + keys expired). With the defaults
+    (1s tick, 64 slots, 4 levels) a single wheel covers ~194 days. Later
+    deadlines are parked in the top level's furthest slot and re-placed
+    whenever that slot is cascaded.
+
+    Deadlines are seconds on the same clock that is passed to ``advance``
+    (e.g. ``time.time()``). A key never expires early. It expires at most one
+    tick late.
+    """
+
+    def __init__(self, tick: float = 1.0, wheel_size: int = 64, levels: int = 4, start: float = 0.0):
+        self.tick = tick
+        self.wheel_size = wheel_size
+        self.levels = levels
+        self._origin = start
+        self._current_tick = 0
+        self._slots: List[List[Set[Hashable]]] = [
+            [set() for _ in range(wheel_size)] for _ in range(levels)
+        ]
+        # key -> (target tick, level, slot); level -1 means "already due"
+        self._locations: Dict[Hashable, Tuple[int, int, int]] = {}
+        self._due: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._locations
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        location = self._locations.get(key)
+        if location is None:
+            return None
+        return self._origin + location[0] * self.tick
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """Schedule ``key`` at ``deadline``, replacing any previous deadline (O(1))."""
+        self.cancel(key)
+        target = max(0, math.ceil((deadline - self._origin) / self.tick))
+        self._place(key, target)
+
+    def cancel(self, key: Hashable) -> bool:
+        location = self._locations.pop(key, None)
+        if location is None:
+            return False
+        _, level, slot = location
+        if level < 0:
+            self._due.discard(key)
+        else:
+            self._slots[level][slot].discard(key)
+        return True
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the wheel to ``now`` and return every key whose deadline has passed."""
+        expired = []
+        now_tick = math.floor((now - self._origin) / self.tick)
+        while self._current_tick < now_tick:
+            self._current_tick += 1
+            # Cascade higher levels first so their keys land in lower-level slots before they are read
+            for level in range(self.levels - 1, 0, -1):
+                span = self.wheel_size ** level
+                if self._current_tick % span == 0:
+                    self._cascade(level, (self._current_tick // span) % self.wheel_size)
+
+            slot = self._slots[0][self._current_tick % self.wheel_size]
+            for key in slot:
+                del self._locations[key]
+            expired.extend(slot)
+            slot.clear()
+
+        # Keys scheduled in the past, or cascaded onto the current tick
+        for key in self._due:
+            del self._locations[key]
+        expired.extend(self._due)
+        self._due.clear()
+        return expired
+
+    def _cascade(self, level: int, slot_index: int) -> None:
+        slot = self._slots[level][slot_index]
+        keys = [(key, self._locations[key][0]) for key in slot]
+        slot.clear()
+        for key, target in keys:
+            self._place(key, target)
+
+    def _place(self, key: Hashable, target: int) -> None:
+        delta = target - self._current_tick
+        if delta <= 0:
+            self._due.add(key)
+            self._locations[key] = (target, -1, -1)
+            return
+
+        for level in range(self.levels):
+            span = self.wheel_size ** level
+            if delta < span * self.wheel_size or level == self.levels - 1:
+                if delta >= span * self.wheel_size:
+                    # Beyond the horizon: park in the furthest top-level slot, re-placed on cascade
+                    slot_index = (self._current_tick // span) % self.wheel_size
+                else:
+                    slot_index = (target // span) % self.wheel_size
+                self._slots[level][slot_index].add(key)
+                self._locations[key] = (target, level, slot_index)
+                return
@@ -1,33 +1,279 @@
+import asyncio
+import os
+import time
+from collections import Counter
 from fastapi import WebSocket
-from typing import List
+from typing import Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.services.ws_frames import FRAME_JSON, Payload, encode_update, select_frame_format
+
+PING_MESSAGE = '{"type": "ping"}'
+
+
+class SubscriptionLimitError(Exception):
+    """Raised when a connection would exceed its subscription cap."""
+
+
+class Connection:
+    """Per-socket record: subscriptions, frame format, liveness and inbound rate-limit state.
+
+    ``__slots__`` drops the per-instance ``__dict__``, which matters with tens of
+    thousands of mostly idle connections per node.
+
+    ``heartbeat`` marks connections that opted in to app-level pings and idle
+    reaping. The others are listen-only and rely on the server's protocol-level
+    ping frames, which browsers answer without any client code.
+    """
+
+    __slots__ = ("websocket", "frame_format", "heartbeat", "subscriptions", "last_seen", "tokens", "tokens_at")
+
+    def __init__(self, websocket: WebSocket, now: float, frame_format: str = FRAME_JSON, heartbeat: bool = False):
+        self.websocket = websocket
+        self.frame_format = frame_format
+        self.heartbeat = heartbeat
+        self.subscriptions: Dict[str, "Subscription"] = {}
+        self.last_seen = now
+        # Token bucket for inbound messages
+        self.tokens = float(settings.WS_INBOUND_BURST)
+        self.tokens_at = now
+
+
+class Subscription:
+    """Delivery state of one connection's subscription to one auction.
+
+    With ``max_rate`` set, updates that arrive faster than the rate are conflated:
+    only the latest one is kept and it is sent as soon as the interval has elapsed,
+    so the subscriber always ends up with the final price.
+    """
+
+    __slots__ = ("connection", "auction_id", "min_interval", "last_sent", "pending", "flush_handle")
+
+    def __init__(self, connection: Connection, auction_id: str, max_rate: Optional[float] = None):
+        self.connection = connection
+        self.auction_id = auction_id
+        self.min_interval = 1.0 / max_rate if max_rate else 0.0
+        self.last_sent = 0.0
+        self.pending: Optional[Payload] = None
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
 
 class ConnectionManager:
     def __init__(self):
-        # Manage all currently connected WebSockets in a list (in memory)
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-
-    async def connect(self, websocket: WebSocket, auction_id: str):
-        await websocket.accept()
-        # If there is no list for this auction_id, create one
-        if auction_id not in self.active_connections:
-            self.active_connections[auction_id] = []
-        # Put the new connection in the list for this auction_id
-        self.active_connections[auction_id].append(websocket)
+        # Reverse index: auction_id -> set of subscriptions. Sets give O(1) connect/disconnect,
+        # and a broadcast only touches the subscribers of that auction.
+        self.active_connections: Dict[str, Set[Subscription]] = {}
+        # Every open socket (the heartbeat/reaper only touches those with connection.heartbeat)
+        self.connections: Dict[WebSocket, Connection] = {}
+        # Keep references to pending flush tasks so they are not garbage collected
+        self._flush_tasks: set = set()
+
+    async def accept(self, websocket: WebSocket, heartbeat: bool = False) -> Connection:
+        # Frame format negotiation: echo the first supported subprotocol the client offered.
+        # Echoing nothing when none is supported keeps clients that send no header on full JSON.
+        frame_format = select_frame_format(websocket.scope.get("subprotocols", ()))
+        await websocket.accept(subprotocol=frame_format)
+        connection = Connection(websocket, time.monotonic(), frame_format or FRAME_JSON, heartbeat)
+        self.connections[websocket] = connection
+        return connection
+
+    async def connect(self, websocket: WebSocket, auction_id: str) -> Connection:
+        # Single-auction socket: a connection with exactly one subscription
+        connection = await self.accept(websocket)
+        self.subscribe(connection, auction_id)
         print(f"📡 New Client Connected. auction_id: {auction_id}")
+        return connection
+
+    def subscribe(self, connection: Connection, auction_id: str, max_rate: Optional[float] = None) -> Subscription:
+        subscription = connection.subscriptions.get(auction_id)
+        if subscription is not None:
+            # Re-subscribing only updates the rate limit
+            subscription.min_interval = 1.0 / max_rate if max_rate else 0.0
+            return subscription
+
+        if len(connection.subscriptions) >= settings.WS_MAX_SUBSCRIPTIONS_PER_CONNECTION:
+            raise SubscriptionLimitError(
+                f"Subscription limit of {settings.WS_MAX_SUBSCRIPTIONS_PER_CONNECTION} reached"
+            )
+
+        subscription = Subscription(connection, auction_id, max_rate)
+        connection.subscriptions[auction_id] = subscription
+        self.active_connections.setdefault(auction_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, connection: Connection, auction_id: str) -> bool:
+        subscription = connection.subscriptions.pop(auction_id, None)
+        if subscription is None:
+            return False
+        self._remove_from_room(subscription)
+        return True
+
+    def subscribed_auctions(self, connection: Connection) -> List[str]:
+        return list(connection.subscriptions)
+
+    def touch(self, connection: Connection) -> bool:
+        """Record an inbound message. Returns False when the connection exceeds its inbound rate."""
+        now = time.monotonic()
+        connection.last_seen = now
+        connection.tokens = min(
+            float(settings.WS_INBOUND_BURST),
+            connection.tokens + (now - connection.tokens_at) * settings.WS_INBOUND_RATE,
+        )
+        connection.tokens_at = now
+        if connection.tokens < 1.0:
+            return False
+        connection.tokens -= 1.0
+        return True
+
+    async def close(self, connection: Connection, code: int, reason: str = ""):
+        self.disconnect(connection.websocket)
+        try:
+            await connection.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass  # Already closed or the peer is gone
+
+    def disconnect(self, websocket: WebSocket):
+        # May run twice for one socket (reaper/failed send, then the endpoint's WebSocketDisconnect)
+        connection = self.connections.pop(websocket, None)
+        if connection is None:
+            return
+        for subscription in connection.subscriptions.values():
+            self._remove_from_room(subscription)
+        print(f"🔌 Client Disconnected. auction_ids: {list(connection.subscriptions)}")
+
+    def _remove_from_room(self, subscription: Subscription):
+        if subscription.flush_handle is not None:
+            subscription.flush_handle.cancel()
+            subscription.flush_handle = None
+        room = self.active_connections.get(subscription.auction_id)
+        if room is not None:
+            room.discard(subscription)
+            if not room:  # If no more connections for this auction_id, remove the key
+                del self.active_connections[subscription.auction_id]
+
+    async def broadcast_to_auction(self, message: str, auction_id: str, data: Optional[dict] = None):
+        # Send a message to specific auction_id clients. ``data`` is the parsed message, if the caller has it.
+        room = self.active_connections.get(auction_id)
+        if not room:
+            return
+
+        # Each frame format is encoded at most once per broadcast, however many subscribers use it
+        payloads: Dict[str, Payload] = {FRAME_JSON: message}
+
+        loop = asyncio.get_running_loop()
+        dead = []
+        # Copy: sends yield to the event loop and the room may change meanwhile
+        for subscription in list(room):
+            frame_format = subscription.connection.frame_format
+            payload = payloads.get(frame_format)
+            if payload is None:
+                payload = payloads[frame_format] = encode_update(frame_format, message, data)
+            wait = subscription.min_interval - (time.monotonic() - subscription.last_sent)
+            if wait > 0 or subscription.pending is not None:
+                # Rate-limited: keep only the latest update and flush it when the interval ends
+                subscription.pending = payload
+                if subscription.flush_handle is None and wait > 0:
+                    subscription.flush_handle = loop.call_later(wait, self._start_flush, subscription)
+                continue
+            if not await self._send(subscription, payload):
+                dead.append(subscription.connection.websocket)
+
+        for websocket in dead:
+            self.disconnect(websocket)
+        print(f"📣 [Broadcasting] New Price: {message} to auction_id: {auction_id}")
+
+    async def _send(self, subscription: Subscription, message: Payload) -> bool:
+        # Stamp before awaiting so updates arriving mid-send are conflated, not sent out of order
+        subscription.last_sent = time.monotonic()
+        websocket = subscription.connection.websocket
+        try:
+            if isinstance(message, bytes):
+                await websocket.send_bytes(message)
+            else:
+                await websocket.send_text(message)
+        except Exception:
+            return False  # Peer is gone; the caller drops the connection
+        return True
+
+    def _start_flush(self, subscription: Subscription):
+        subscription.flush_handle = None
+        task = asyncio.create_task(self._flush(subscription))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, subscription: Subscription):
+        message, subscription.pending = subscription.pending, None
+        websocket = subscription.connection.websocket
+        if message is None or websocket not in self.connections:
+            return
+        if not await self._send(subscription, message):
+            self.disconnect(websocket)
+            return
+        # An update that arrived during the send waits for the next interval
+        if subscription.pending is not None and subscription.flush_handle is None:
+            subscription.flush_handle = asyncio.get_running_loop().call_later(
+                subscription.min_interval, self._start_flush, subscription
+            )
+
+    async def run_heartbeat(self):
+        """Ping opted-in connections periodically and reap the ones that stopped answering."""
+        print(f"💓 WebSocket heartbeat started (ping every {settings.WS_PING_INTERVAL_SECONDS}s, "
+              f"idle timeout {settings.WS_IDLE_TIMEOUT_SECONDS}s)")
+        while True:
+            await asyncio.sleep(settings.WS_PING_INTERVAL_SECONDS)
+            reaped = await self.heartbeat_once()
+            if reaped:
+                print(f"🧹 Reaped {reaped} idle WebSocket connection(s)")
+
+    async def heartbeat_once(self) -> int:
+        # Any inbound message (pong or control) refreshes last_seen; silent peers are reaped.
+        # Listen-only connections are skipped: protocol pings and failed sends detect their dead peers.
+        now = time.monotonic()
+        idle, alive = [], []
+        for connection in self.connections.values():
+            if not connection.heartbeat:
+                continue
+            if now - connection.last_seen > settings.WS_IDLE_TIMEOUT_SECONDS:
+                idle.append(connection)
+            else:
+                alive.append(connection)
+
+        for connection in idle:
+            await self.close(connection, code=1001, reason="Idle timeout")
+        results = await asyncio.gather(*(self._ping(connection) for connection in alive))
+
+        dead = [connection for connection, ok in zip(alive, results) if not ok]
+        for connection in dead:
+            await self.close(connection, code=1011, reason="Ping failed")
+        return len(idle) + len(dead)
+
+    async def _ping(self, connection: Connection) -> bool:
+        try:
+            await asyncio.wait_for(
+                connection.websocket.send_text(PING_MESSAGE), timeout=settings.WS_SEND_TIMEOUT_SECONDS
+            )
+        except Exception:
+            return False
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self.connections),
+            "subscriptions": sum(len(room) for room in self.active_connections.values()),
+            "auctions": len(self.active_connections),
+            "frame_formats": dict(Counter(connection.frame_format for connection in self.connections.values())),
+            "rss_bytes": _current_rss_bytes(),
+        }
 
-    def disconnect(self, websocket: WebSocket, auction_id: str):
-        if auction_id in self.active_connections:
-            self.active_connections[auction_id].remove(websocket)
-            if not self.active_connections[auction_id]:  # If no more connections for this auction_id, remove the key
-                del self.active_connections[auction_id]
-        print(f"🔌 Client Disconnected. auction_id: {auction_id}")
 
-    async def broadcast_to_auction(self, message: str, auction_id: str):
-        # Send a message to specific auction_id clients
-        if auction_id in self.active_connections:
-            for connection in self.active_connections[auction_id]:
-                await connection.send_text(message)
-            print(f"📣 [Broadcasting] New Price: {message} to auction_id: {auction_id}")
+def _current_rss_bytes() -> Optional[int]:
+    # Linux only; used to report memory per idle connection
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
 
 # Create an instance to be used globally
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager()
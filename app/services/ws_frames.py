@@ -0,0 +1,79 @@
+import json
+import struct
+from typing import Iterable, Optional, Union
+
+# Frame formats, negotiated per connection through the Sec-WebSocket-Protocol header.
+# A client that offers none of them gets FRAME_JSON (the original behaviour).
+FRAME_JSON = "auction.v1.json"  # the published BidTask as-is, e.g. {"bid_id": "...", "user_id": 7, ...}
+FRAME_COMPACT = "auction.v1.compact"  # {"a": auction_id, "p": price} (+ "e": ends_at ms, "c": 1 when closed)
+FRAME_BINARY = "auction.v1.binary"  # binary frames, layouts below
+FRAME_FORMATS = (FRAME_JSON, FRAME_COMPACT, FRAME_BINARY)
+
+# Binary layouts (network byte order). Pings and control replies stay JSON text frames in every format.
+BINARY_PRICE = 1  # kind, auction_id, price                   -> 9 bytes
+BINARY_PRICE_EXTENDED = 2  # kind, auction_id, price, ends_at ms  -> 17 bytes
+BINARY_CLOSED = 3  # kind, auction_id, final price, ends_at ms    -> 17 bytes
+_PRICE = struct.Struct("!BII")
+_PRICE_WITH_END = struct.Struct("!BIIQ")
+# Values that do not fit (the bid API accepts any positive 64-bit amount) go out as compact JSON text instead
+_UINT32_MAX = 2**32 - 1
+_UINT64_MAX = 2**64 - 1
+
+Payload = Union[str, bytes]
+
+
+def select_frame_format(offered: Iterable[str]) -> Optional[str]:
+    """Return the first subprotocol offered by the client that the server supports, or None."""
+    for subprotocol in offered:
+        if subprotocol in FRAME_FORMATS:
+            return subprotocol
+    return None
+
+
+def encode_update(frame_format: str, message: str, data: Optional[dict] = None) -> Payload:
+    """Encode one Pub/Sub message for connections using ``frame_format``.
+
+    Messages that are neither a price update nor an ``auction_closed`` notice are
+    forwarded unchanged as text.
+    """
+    if frame_format == FRAME_JSON:
+        return message
+    if data is None:
+        try:
+            data = json.loads(message)
+        except json.JSONDecodeError:
+            return message
+
+    closed = data.get("type") == "auction_closed"
+    price = data.get("final_price") if closed else data.get("amount")
+    if price is None or data.get("auction_id") is None:
+        return message
+    auction_id, price, ends_at = int(data["auction_id"]), int(price), int(data.get("ends_at") or 0)
+
+    if frame_format == FRAME_BINARY and 0 <= auction_id <= _UINT32_MAX and 0 <= price <= _UINT32_MAX \
+            and 0 <= ends_at <= _UINT64_MAX:
+        if closed:
+            return _PRICE_WITH_END.pack(BINARY_CLOSED, auction_id, price, ends_at)
+        if ends_at:
+            return _PRICE_WITH_END.pack(BINARY_PRICE_EXTENDED, auction_id, price, ends_at)
+        return _PRICE.pack(BINARY_PRICE, auction_id, price)
+
+    # All fields are integers, so formatting directly is valid JSON and much cheaper than json.dumps
+    compact = f'{{"a":{auction_id},"p":{price}'
+    if ends_at:
+        compact += f',"e":{ends_at}'
+    if closed:
+        compact += ',"c":1'
+    return compact + "}"
+
+
+def decode_binary(frame: bytes) -> dict:
+    """Decode a binary frame back into the compact shape (clients, load test and benchmark)."""
+    if frame[0] == BINARY_PRICE:
+        _, auction_id, price = _PRICE.unpack(frame)
+        return {"a": auction_id, "p": price}
+    kind, auction_id, price, ends_at = _PRICE_WITH_END.unpack(frame)
+    decoded = {"a": auction_id, "p": price, "e": ends_at}
+    if kind == BINARY_CLOSED:
+        decoded["c"] = 1
+    return decoded
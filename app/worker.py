@@ -1,14 +1,22 @@
 import asyncio
+# Keep this entry point's imports to the consumer path only (no FastAPI/WebSocket modules);
+# scripts/test_startup.py enforces it.
+from app.core.config import settings
+from app.db.session import dispose_engine
 from app.services.kafka import KafkaService, consume_and_save_bids
+from app.services.metrics import register_hot_auction_metrics, start_metrics_server
 
 async def main():
     print("👷 Python Kafka Worker Started! Waiting for bids...")
+    register_hot_auction_metrics("worker")
+    start_metrics_server(settings.WORKER_METRICS_PORT)
     try:
         await consume_and_save_bids()
     except asyncio.CancelledError:
         print("🛑 Worker shutting down...")
     finally:
         await KafkaService.close()
+        await dispose_engine()
         print("✅ Kafka connection closed.")
 
 if __name__ == "__main__":
@@ -95,7 +95,7 @@ func main() {
 	// Setup Router and API routes
 	r := gin.Default()
 	r.Use(prometheusMiddleware())
-	h := api.NewHandler(db, rdb, pool)
+	h := api.NewHandler(db, rdb, pool, cfg.AntiSnipe)
 	api.RegisterRoutes(r, h)
 
 	r.GET("/metrics", gin.WrapH(promhttp.Handler()))
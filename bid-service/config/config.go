@@ -4,6 +4,7 @@ import (
 	"log"
 	"os"
 	"strconv"
+	"time"
 )
 
 type DBConfig struct {
@@ -14,12 +15,20 @@ type DBConfig struct {
 	Name     string
 }
 
+// AntiSnipeConfig extends an auction when a bid lands within Window of its end:
+// the new end time becomes now + Extension. A zero Window disables it.
+type AntiSnipeConfig struct {
+	Window    time.Duration
+	Extension time.Duration
+}
+
 type Config struct {
 	RedisAddr   string
 	KafkaBroker string
 	KafkaTopic  string
 	DB          DBConfig
 	WorkerCount int
+	AntiSnipe   AntiSnipeConfig
 }
 
 func GetEnv(key, fallback string) string {
@@ -29,6 +38,15 @@ func GetEnv(key, fallback string) string {
 	return fallback
 }
 
+func getEnvSeconds(key string, fallback time.Duration) time.Duration {
+	if value := os.Getenv(key); value != "" {
+		if n, err := strconv.Atoi(value); err == nil {
+			return time.Duration(n) * time.Second
+		}
+	}
+	return fallback
+}
+
 func Load() *Config {
 	workerCount := 100
 	if envWorkers := os.Getenv("WORKER_COUNT"); envWorkers != "" {
@@ -49,10 +67,15 @@ func Load() *Config {
 			Name:     GetEnv("POSTGRES_DB", "auction_db"),
 		},
 		WorkerCount: workerCount,
+		AntiSnipe: AntiSnipeConfig{
+			Window:    getEnvSeconds("ANTI_SNIPE_WINDOW_SECONDS", 0),
+			Extension: getEnvSeconds("ANTI_SNIPE_EXTENSION_SECONDS", 0),
+		},
 	}
 
-	log.Printf("✅ Configuration loaded: Redis=%s, Kafka=%s:%s, DB=%s:%s, Workers=%d",
-		cfg.RedisAddr, cfg.KafkaBroker, cfg.KafkaTopic, cfg.DB.Host, cfg.DB.Port, cfg.WorkerCount)
+	log.Printf("✅ Configuration loaded: Redis=%s, Kafka=%s:%s, DB=%s:%s, Workers=%d, AntiSnipe=%s/%s",
+		cfg.RedisAddr, cfg.KafkaBroker, cfg.KafkaTopic, cfg.DB.Host, cfg.DB.Port, cfg.WorkerCount,
+		cfg.AntiSnipe.Window, cfg.AntiSnipe.Extension)
 
 	return cfg
 }
@@ -11,6 +11,7 @@ import (
 	"net/http"
 	"time"
 
+	"bid-service/config"
 	"bid-service/internal/models"
 	"bid-service/internal/repository"
 	"bid-service/internal/worker"
@@ -22,13 +23,14 @@ import (
 )
 
 type Handler struct {
-	db   *sql.DB
-	rdb  *redis.Client
-	pool *worker.Pool
+	db        *sql.DB
+	rdb       *redis.Client
+	pool      *worker.Pool
+	antiSnipe config.AntiSnipeConfig
 }
 
-func NewHandler(db *sql.DB, rdb *redis.Client, pool *worker.Pool) *Handler {
-	return &Handler{db: db, rdb: rdb, pool: pool}
+func NewHandler(db *sql.DB, rdb *redis.Client, pool *worker.Pool, antiSnipe config.AntiSnipeConfig) *Handler {
+	return &Handler{db: db, rdb: rdb, pool: pool, antiSnipe: antiSnipe}
 }
 
 func (h *Handler) PlaceBid(c *gin.Context) {
@@ -46,9 +48,10 @@ func (h *Handler) PlaceBid(c *gin.Context) {
 		req.UserID, req.AuctionID, req.Amount)
 
 	auctionPriceKey := fmt.Sprintf("auction:%d:price", req.AuctionID)
+	auctionEndsAtKey := fmt.Sprintf("auction:%d:ends_at", req.AuctionID)
 
 	redisAuctionPriceAccessTotal.WithLabelValues("eval", "attempt").Inc()
-	result, err := repository.EvalBidScript(ctx, h.rdb, models.BidLuaScript, auctionPriceKey, req.Amount)
+	result, err := repository.EvalBidScript(ctx, h.rdb, models.BidLuaScript, auctionPriceKey, auctionEndsAtKey, req.Amount, h.antiSnipe.Window, h.antiSnipe.Extension)
 	if err != nil {
 		redisAuctionPriceAccessTotal.WithLabelValues("eval", "error").Inc()
 		log.Printf("❌ Redis Lua script error: %v", err)
@@ -61,7 +64,12 @@ func (h *Handler) PlaceBid(c *gin.Context) {
 	}
 	redisAuctionPriceAccessTotal.WithLabelValues("eval", "success").Inc()
 
-	if result == -1 {
+	if result.Status == models.BidScriptClosed {
+		respondAuctionClosed(c, req.AuctionID)
+		return
+	}
+
+	if result.Status == models.BidScriptMiss {
 		log.Printf("🔍 Cache miss for auction %d, querying database...", req.AuctionID)
 
 		auction, err := repository.GetAuctionByID(ctx, h.db, req.AuctionID)
@@ -79,6 +87,15 @@ func (h *Handler) PlaceBid(c *gin.Context) {
 			return
 		}
 
+		// Seed the end time so the Lua script enforces the deadline from now on
+		if auction.EndsAt.Valid {
+			_ = h.rdb.SetNX(ctx, auctionEndsAtKey, auction.EndsAt.Time.UnixMilli(), 0)
+		}
+		if auction.Status == models.AuctionStatusClosed || (auction.EndsAt.Valid && !time.Now().Before(auction.EndsAt.Time)) {
+			respondAuctionClosed(c, req.AuctionID)
+			return
+		}
+
 		if req.Amount <= auction.CurrentPrice {
 			log.Printf("⚠️  Bid too low: %d <= %d", req.Amount, auction.CurrentPrice)
 			redisAuctionPriceAccessTotal.WithLabelValues("set", "seed").Inc()
@@ -123,7 +140,7 @@ func (h *Handler) PlaceBid(c *gin.Context) {
 		}
 
 		redisAuctionPriceAccessTotal.WithLabelValues("eval", "attempt").Inc()
-		result, err = repository.EvalBidScript(ctx, h.rdb, models.BidLuaScript, auctionPriceKey, req.Amount)
+		result, err = repository.EvalBidScript(ctx, h.rdb, models.BidLuaScript, auctionPriceKey, auctionEndsAtKey, req.Amount, h.antiSnipe.Window, h.antiSnipe.Extension)
 		if err != nil {
 			redisAuctionPriceAccessTotal.WithLabelValues("eval", "error").Inc()
 			log.Printf("❌ Redis Lua script error after cache seed: %v", err)
@@ -135,7 +152,12 @@ func (h *Handler) PlaceBid(c *gin.Context) {
 			return
 		}
 
-		if result == 0 {
+		if result.Status == models.BidScriptClosed {
+			respondAuctionClosed(c, req.AuctionID)
+			return
+		}
+
+		if result.Status == models.BidScriptTooLow {
 			currentPrice, _ := repository.GetAuctionPrice(ctx, h.rdb, auctionPriceKey)
 			log.Printf("⚠️  Bid rejected: %d <= current price %d", req.Amount, currentPrice)
 			c.JSON(http.StatusConflict, gin.H{
@@ -153,7 +175,7 @@ func (h *Handler) PlaceBid(c *gin.Context) {
 		} else {
 			redisAuctionPriceAccessTotal.WithLabelValues("set", "success").Inc()
 		}
-	} else if result == 0 {
+	} else if result.Status == models.BidScriptTooLow {
 		redisAuctionPriceAccessTotal.WithLabelValues("get", "attempt").Inc()
 		currentPrice, _ := repository.GetAuctionPrice(ctx, h.rdb, auctionPriceKey)
 		redisAuctionPriceAccessTotal.WithLabelValues("get", "success").Inc()
@@ -168,12 +190,18 @@ func (h *Handler) PlaceBid(c *gin.Context) {
 
 	log.Printf("✅ Bid accepted: auction_id=%d, amount=%d", req.AuctionID, req.Amount)
 
-	h.pool.Submit(models.BidTask{
-		BidID:     uuid.New().String(),
+	task := models.BidTask{
+		BidID:     uuid.Must(uuid.NewV7()).String(), // time-ordered: appends to the bid_id index instead of random page splits
 		UserID:    req.UserID,
 		AuctionID: req.AuctionID,
 		Amount:    req.Amount,
-	})
+	}
+	if result.Status == models.BidScriptExtended {
+		// Anti-sniping: viewers and the closing scheduler learn the new end time from this task
+		log.Printf("⏱️  Auction %d extended to %d", req.AuctionID, result.EndsAtMs)
+		task.EndsAt = result.EndsAtMs
+	}
+	h.pool.Submit(task)
 
 	c.JSON(http.StatusAccepted, gin.H{
 		"status":     "accepted",
@@ -187,6 +215,15 @@ func (h *Handler) Health(c *gin.Context) {
 	c.JSON(http.StatusOK, gin.H{"status": "healthy"})
 }
 
+func respondAuctionClosed(c *gin.Context, auctionID int) {
+	log.Printf("⚠️  Bid rejected: auction %d has ended", auctionID)
+	c.JSON(http.StatusConflict, gin.H{
+		"detail":     "Auction has ended",
+		"auction_id": auctionID,
+		"status":     models.AuctionStatusClosed,
+	})
+}
+
 func classifyBindError(err error) (int, string) {
 	var syntaxErr *json.SyntaxError
 	var typeErr *json.UnmarshalTypeError
@@ -1,18 +1,48 @@
 package models
 
+import "database/sql"
+
+// BidLuaScript validates and applies a bid in one atomic step.
+// KEYS[1] = auction price key, KEYS[2] = auction end time key (unix ms, optional)
+// ARGV[1] = bid amount, ARGV[2] = anti-sniping window (ms), ARGV[3] = anti-sniping extension (ms)
+// Returns {status, ends_at_ms}; see the BidScript* status codes below.
 const BidLuaScript = `
 local current_price = redis.call('get', KEYS[1])
-if current_price then
-    if tonumber(ARGV[1]) <= tonumber(current_price) then
-        return 0
+if not current_price then
+    return {-1, 0}
+end
+local ends_at = tonumber(redis.call('get', KEYS[2]) or '0')
+local now = redis.call('time')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+if ends_at > 0 and now_ms >= ends_at then
+    return {-2, ends_at}
+end
+if tonumber(ARGV[1]) <= tonumber(current_price) then
+    return {0, ends_at}
+end
+redis.call('set', KEYS[1], ARGV[1])
+local window = tonumber(ARGV[2])
+if ends_at > 0 and window > 0 and ends_at - now_ms < window then
+    local extended = now_ms + tonumber(ARGV[3])
+    if extended > ends_at then
+        redis.call('set', KEYS[2], string.format('%.0f', extended))
+        return {2, extended}
     end
-    redis.call('set', KEYS[1], ARGV[1])
-    return 1
-else
-    return -1
 end
+return {1, ends_at}
 `
 
+// Status codes returned by BidLuaScript.
+const (
+	BidScriptClosed   = -2 // auction end time has passed
+	BidScriptMiss     = -1 // price not cached
+	BidScriptTooLow   = 0
+	BidScriptAccepted = 1
+	BidScriptExtended = 2 // accepted and the end time was extended (anti-sniping)
+)
+
+const AuctionStatusClosed = "closed"
+
 type BidRequest struct {
 	UserID    int `json:"user_id" binding:"required"`
 	AuctionID int `json:"auction_id" binding:"required"`
@@ -23,6 +53,8 @@ type Auction struct {
 	ID           int
 	ItemName     string
 	CurrentPrice int
+	EndsAt       sql.NullTime
+	Status       string
 }
 
 type BidTask struct {
@@ -30,4 +62,5 @@ type BidTask struct {
 	UserID    int    `json:"user_id"`
 	AuctionID int    `json:"auction_id"`
 	Amount    int    `json:"amount"`
+	EndsAt    int64  `json:"ends_at,omitempty"` // new end time (unix ms) when this bid extended the auction
 }
@@ -19,9 +19,9 @@ func GetAuctionByID(ctx context.Context, db *sql.DB, auctionID int) (models.Auct
 	var auction models.Auction
 	err := db.QueryRowContext(
 		ctx,
-		"SELECT id, item_name, current_price FROM auctions WHERE id = $1",
+		"SELECT id, item_name, current_price, ends_at, status FROM auctions WHERE id = $1",
 		auctionID,
-	).Scan(&auction.ID, &auction.ItemName, &auction.CurrentPrice)
+	).Scan(&auction.ID, &auction.ItemName, &auction.CurrentPrice, &auction.EndsAt, &auction.Status)
 
 	return auction, err
 }
@@ -2,16 +2,28 @@ package repository
 
 import (
 	"context"
+	"time"
 
 	"github.com/redis/go-redis/v9"
 )
 
+// BidScriptResult is the decoded reply of models.BidLuaScript.
+type BidScriptResult struct {
+	Status   int
+	EndsAtMs int64
+}
+
 func NewRedisClient(addr string) *redis.Client {
 	return redis.NewClient(&redis.Options{Addr: addr})
 }
 
-func EvalBidScript(ctx context.Context, rdb *redis.Client, script string, auctionPriceKey string, amount int) (int, error) {
-	return rdb.Eval(ctx, script, []string{auctionPriceKey}, amount).Int()
+func EvalBidScript(ctx context.Context, rdb *redis.Client, script string, auctionPriceKey string, auctionEndsAtKey string, amount int, antiSnipeWindow time.Duration, antiSnipeExtension time.Duration) (BidScriptResult, error) {
+	reply, err := rdb.Eval(ctx, script, []string{auctionPriceKey, auctionEndsAtKey},
+		amount, antiSnipeWindow.Milliseconds(), antiSnipeExtension.Milliseconds()).Int64Slice()
+	if err != nil {
+		return BidScriptResult{}, err
+	}
+	return BidScriptResult{Status: int(reply[0]), EndsAtMs: reply[1]}, nil
 }
 
 func SetAuctionPrice(ctx context.Context, rdb *redis.Client, key string, price int) error {
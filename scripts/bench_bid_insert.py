@@ -0,0 +1,216 @@
+"""Bid insert throughput, WAL and storage per bid for each bids schema variant.
+
+Compares persistence variants of the Kafka worker on scratch tables that
+mirror ``bids``:
+
+- ``unique_index``: the original schema in at-least-once mode. INTEGER id
+  with a redundant ``ix_bids_id`` B-tree, VARCHAR random v4 ``bid_id`` and a
+  unique B-tree on it
+  (``INSERT ... ON CONFLICT DO NOTHING``), probed and updated for every row.
+- ``offsets``: exactly-once mode on the original schema. There is no
+  ``bid_id`` index, and the partition offset is upserted in
+  ``consumer_offsets`` style in the same transaction as the batch.
+- ``compact``: the current schema. BIGINT id, native UUID ``bid_id`` holding
+  time-ordered UUIDv7 values with its unique index, and a BRIN index on
+  ``created_at``.
+- ``compact_offsets``: the current schema in exactly-once mode, without the
+  ``bid_id`` index.
+
+Each table is pre-filled first, because random-key index cost grows once the
+index no longer fits in shared buffers. Then ``--rows`` bids are inserted in
+worker-sized batches, one transaction per batch. The script reports rows per
+second, WAL bytes per row and the on-disk bytes per row. Foreign keys are
+omitted; they cost the same in every variant.
+
+Usage:
+    python scripts/bench_bid_insert.py --prefill 1000000 --rows 200000
+    python scripts/bench_bid_insert.py --variants unique_index compact
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, MetaData, String, Table, Uuid, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.core.ids import uuid7  # noqa: E402
+
+OFFSETS_TABLE = "bench_consumer_offsets"
+
+# Same layout as app.core.ids.uuid7, for prefilling in SQL (Postgres 16 has no uuidv7())
+SQL_UUID7 = (
+    "encode(set_bit(set_bit(overlay(uuid_send(gen_random_uuid()) placing "
+    "substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3) "
+    "FROM 1 FOR 6), 52, 1), 53, 1), 'hex')::uuid"
+)
+
+
+@dataclass(frozen=True)
+class Variant:
+    id_type: type
+    bid_id_type: object
+    new_bid_id: Callable[[], object]  # producer-side id generator
+    sql_bid_id: str  # prefill expression
+    ddl: tuple = ()  # statements after CREATE TABLE
+    store_offsets: bool = False  # exactly-once mode: offset upsert in the batch transaction
+
+
+LEGACY = dict(id_type=Integer, bid_id_type=String, new_bid_id=lambda: str(uuid.uuid4()),
+              sql_bid_id="gen_random_uuid()::text")
+COMPACT = dict(id_type=BigInteger, bid_id_type=Uuid(as_uuid=True), new_bid_id=uuid7, sql_bid_id=SQL_UUID7)
+BRIN = "CREATE INDEX ON {table} USING brin (created_at)"
+UNIQUE_BID_ID = "CREATE UNIQUE INDEX ON {table} (bid_id)"
+LEGACY_ID_INDEX = "CREATE INDEX ON {table} (id)"  # ix_bids_id, duplicated the primary key
+
+VARIANTS = {
+    "unique_index": Variant(**LEGACY, ddl=(LEGACY_ID_INDEX, UNIQUE_BID_ID)),
+    "offsets": Variant(**LEGACY, ddl=(LEGACY_ID_INDEX,), store_offsets=True),
+    "compact": Variant(**COMPACT, ddl=(UNIQUE_BID_ID, BRIN)),
+    "compact_offsets": Variant(**COMPACT, ddl=(BRIN,), store_offsets=True),
+}
+
+
+def bench_table(name: str, variant: Variant) -> Table:
+    """Scratch copy of the bids table (same columns, no foreign keys)."""
+    return Table(
+        name,
+        MetaData(),
+        Column("id", variant.id_type, primary_key=True),
+        Column("bid_id", variant.bid_id_type, nullable=False),
+        Column("price", Integer, nullable=False),
+        Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+        Column("user_id", Integer, nullable=False),
+        Column("auction_id", Integer, nullable=False),
+    )
+
+
+def offsets_table() -> Table:
+    return Table(
+        OFFSETS_TABLE,
+        MetaData(),
+        Column("partition", Integer, primary_key=True),
+        Column("next_offset", BigInteger, nullable=False),
+    )
+
+
+def make_batch(variant: Variant, size: int) -> list[dict]:
+    """Bids shaped like the worker's insert values."""
+    return [
+        {
+            "bid_id": variant.new_bid_id(),
+            "user_id": random.randint(1, 100),
+            "auction_id": random.randint(1, 5),
+            "price": random.randint(1000, 10_000_000),
+        }
+        for _ in range(size)
+    ]
+
+
+async def wal_lsn(engine: AsyncEngine) -> int:
+    async with engine.connect() as conn:
+        return await conn.scalar(text("SELECT pg_current_wal_lsn() - '0/0'::pg_lsn"))
+
+
+async def prepare(engine: AsyncEngine, variant: str, prefill: int) -> Table:
+    """(Re)create and pre-fill the scratch table for one variant."""
+    spec = VARIANTS[variant]
+    table = bench_table(f"bench_bids_{variant}", spec)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table.name}"))
+        await conn.run_sync(table.metadata.create_all)
+        for statement in spec.ddl:
+            await conn.execute(text(statement.format(table=table.name)))
+        await conn.execute(text(f"DROP TABLE IF EXISTS {OFFSETS_TABLE}"))
+        await conn.run_sync(offsets_table().metadata.create_all)
+        await conn.execute(text(
+            f"INSERT INTO {table.name} (bid_id, price, user_id, auction_id) "
+            f"SELECT {spec.sql_bid_id}, g, 1 + g % 100, 1 + g % 5 FROM generate_series(1, :n) g"
+        ), {"n": prefill})
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"VACUUM ANALYZE {table.name}"))
+    return table
+
+
+async def run_variant(engine: AsyncEngine, variant: str, prefill: int, rows: int, batch_size: int) -> dict:
+    """Insert ``rows`` bids in batches and return throughput, WAL and size figures."""
+    table = await prepare(engine, variant, prefill)
+    spec = VARIANTS[variant]
+    offsets = offsets_table()
+    batches = [make_batch(spec, batch_size) for _ in range(rows // batch_size)]
+
+    wal_before = await wal_lsn(engine)
+    start = time.perf_counter()
+    next_offset = 0
+    for batch in batches:
+        async with engine.begin() as conn:
+            stmt = insert(table).values(batch)
+            if not spec.store_offsets:
+                stmt = stmt.on_conflict_do_nothing(index_elements=["bid_id"])
+            await conn.execute(stmt.returning(table.c.auction_id, table.c.user_id, table.c.price))
+            if spec.store_offsets:
+                first_offset, next_offset = next_offset, next_offset + len(batch)
+                upsert = insert(offsets).values(partition=0, next_offset=next_offset)
+                await conn.execute(upsert.on_conflict_do_update(
+                    index_elements=["partition"],
+                    set_={"next_offset": upsert.excluded.next_offset},
+                    where=offsets.c.next_offset <= first_offset,
+                ))
+    elapsed = time.perf_counter() - start
+    wal_bytes = await wal_lsn(engine) - wal_before
+
+    async with engine.connect() as conn:
+        total_bytes = await conn.scalar(text(f"SELECT pg_total_relation_size('{table.name}')"))
+        index_bytes = await conn.scalar(text(f"SELECT pg_indexes_size('{table.name}')"))
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE {table.name}"))
+        await conn.execute(text(f"DROP TABLE {OFFSETS_TABLE}"))
+
+    inserted = len(batches) * batch_size
+    return {
+        "rows_per_second": inserted / elapsed,
+        "wal_bytes_per_row": wal_bytes / inserted,
+        "bytes_per_row": total_bytes / (prefill + inserted),
+        "index_bytes_per_row": index_bytes / (prefill + inserted),
+    }
+
+
+async def main() -> None:
+    """Benchmark every selected variant and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Bid insert throughput per persistence variant")
+    parser.add_argument("--prefill", type=int, default=1_000_000, help="Existing rows before measuring")
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows inserted while measuring")
+    parser.add_argument("--batch", type=int, default=1000, help="Rows per transaction (worker batch size)")
+    parser.add_argument("--variants", nargs="*", choices=list(VARIANTS), default=list(VARIANTS))
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    results = {}
+    try:
+        for variant in args.variants:
+            print(f"⏱️  {variant}: prefill {args.prefill}, insert {args.rows} in batches of {args.batch}...")
+            results[variant] = await run_variant(engine, variant, args.prefill, args.rows, args.batch)
+    finally:
+        await engine.dispose()
+
+    print("=" * 78)
+    print(f"{'variant':<16}{'rows/s':>12}{'WAL B/row':>14}{'disk B/row':>14}{'index B/row':>14}")
+    print("=" * 78)
+    for variant, r in results.items():
+        print(f"{variant:<16}{r['rows_per_second']:>12,.0f}{r['wal_bytes_per_row']:>14,.0f}"
+              f"{r['bytes_per_row']:>14,.0f}{r['index_bytes_per_row']:>14,.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,172 @@
+"""Bytes on the wire and CPU cost per price update for each WebSocket frame format.
+
+Replays a synthetic stream of Go ``BidTask`` messages (UUIDv7 ``bid_id``,
+rising prices, an occasional anti-sniping ``ends_at``) through each frame
+format, using the same encoder as the server. Each format is then
+compressed with the same permessage-deflate implementation that uvicorn
+uses. The compression variants are:
+
+- ``none``: no compression, e.g. the client did not offer permessage-deflate
+- ``deflate_no_ctx``: deflate without context takeover. Every frame is
+  compressed on its own.
+- ``deflate_ctx``: deflate with context takeover and the server settings
+  from ``WS_DEFLATE_WINDOW_BITS`` / ``WS_DEFLATE_MEM_LEVEL``
+- ``deflate_ctx_zlib``: context takeover with zlib's defaults (32 KiB window,
+  memLevel 8), i.e. what uvicorn negotiates out of the box
+
+For every combination the script reports:
+
+- wire bytes per update, including the WebSocket frame header
+- encode cost per update. This is paid once per broadcast, because each
+  format is encoded once for all of its subscribers.
+- compress cost per update. This is paid once per subscriber, because every
+  connection owns its compressor.
+- compressor memory per connection, measured with tracemalloc
+
+Usage:
+    python scripts/bench_ws_frames.py --updates 20000
+    python scripts/bench_ws_frames.py --auctions 20   # a multiplexed viewer watching 20 auctions
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional
+
+from websockets.extensions.permessage_deflate import PerMessageDeflate
+from websockets.frames import Frame, Opcode
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.core.ids import uuid7  # noqa: E402
+from app.services.ws_frames import FRAME_FORMATS, encode_update  # noqa: E402
+
+ZLIB_DEFAULT_WINDOW_BITS = 15
+ZLIB_DEFAULT_MEM_LEVEL = 8
+
+
+def deflate(context_takeover: bool, window_bits: int, mem_level: int) -> Callable[[], PerMessageDeflate]:
+    """Server-side permessage-deflate extension as negotiated by ServerPerMessageDeflateFactory."""
+    return lambda: PerMessageDeflate(
+        remote_no_context_takeover=False,
+        local_no_context_takeover=not context_takeover,
+        remote_max_window_bits=ZLIB_DEFAULT_WINDOW_BITS,
+        local_max_window_bits=window_bits,
+        compress_settings={"memLevel": mem_level},
+    )
+
+
+COMPRESSION = {
+    "none": None,
+    "deflate_no_ctx": deflate(False, settings.WS_DEFLATE_WINDOW_BITS, settings.WS_DEFLATE_MEM_LEVEL),
+    "deflate_ctx": deflate(True, settings.WS_DEFLATE_WINDOW_BITS, settings.WS_DEFLATE_MEM_LEVEL),
+    "deflate_ctx_zlib": deflate(True, ZLIB_DEFAULT_WINDOW_BITS, ZLIB_DEFAULT_MEM_LEVEL),
+}
+
+
+def bid_stream(updates: int, auctions: int) -> list[tuple[str, dict]]:
+    """Published messages as (raw JSON, parsed dict), as the Pub/Sub listener sees them."""
+    prices = {auction_id: random.randint(10_000, 1_000_000) for auction_id in range(1, auctions + 1)}
+    now_ms = int(time.time() * 1000)
+    messages = []
+    for i in range(updates):
+        auction_id = random.randint(1, auctions)
+        prices[auction_id] += random.choice((100, 500, 1000, 5000))
+        task = {
+            "bid_id": str(uuid7()),
+            "user_id": random.randint(1, 100_000),
+            "auction_id": auction_id,
+            "amount": prices[auction_id],
+        }
+        if random.random() < 0.05:  # the bid landed in the anti-sniping window
+            task["ends_at"] = now_ms + 30_000 + i
+        # Same encoding as the Go producer (no spaces)
+        messages.append((json.dumps(task, separators=(",", ":")), task))
+    return messages
+
+
+def frame_header_bytes(length: int) -> int:
+    # Server-to-client frames are unmasked: 2 bytes, +2 for lengths 126..65535, +8 above
+    return 2 if length < 126 else 4 if length < 65536 else 10
+
+
+def to_frame(payload) -> Frame:
+    if isinstance(payload, bytes):
+        return Frame(Opcode.BINARY, payload)
+    return Frame(Opcode.TEXT, payload.encode())
+
+
+def compressor_bytes(factory: Optional[Callable[[], PerMessageDeflate]], sample: Frame, connections: int = 200) -> int:
+    """Memory held per connection by the compression state, after it has sent one frame."""
+    if factory is None:
+        return 0
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    extensions = [factory() for _ in range(connections)]
+    for extension in extensions:
+        extension.encode(sample)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held // connections
+
+
+def run(frame_format: str, compression: str, messages: list[tuple[str, dict]]) -> dict:
+    """Encode and compress the stream the way one subscriber's connection would receive it."""
+    start = time.perf_counter()
+    payloads = [encode_update(frame_format, raw, data) for raw, data in messages]
+    encode_seconds = time.perf_counter() - start
+    frames = [to_frame(payload) for payload in payloads]
+
+    factory = COMPRESSION[compression]
+    start = time.perf_counter()
+    if factory is not None:
+        extension = factory()
+        frames = [extension.encode(frame) for frame in frames]
+    compress_seconds = time.perf_counter() - start
+
+    wire = sum(len(frame.data) + frame_header_bytes(len(frame.data)) for frame in frames)
+    return {
+        "bytes_per_update": wire / len(messages),
+        "encode_us": encode_seconds / len(messages) * 1e6,
+        "compress_us": compress_seconds / len(messages) * 1e6,
+        "memory_bytes": compressor_bytes(factory, to_frame(payloads[0])),
+    }
+
+
+def main() -> None:
+    """Benchmark every frame format and compression variant and print a comparison table."""
+    parser = argparse.ArgumentParser(description="WebSocket bytes and CPU per price update")
+    parser.add_argument("--updates", type=int, default=20_000, help="Price updates in the stream")
+    parser.add_argument("--auctions", type=int, default=1, help="Auctions the viewer is subscribed to")
+    parser.add_argument("--formats", nargs="*", choices=FRAME_FORMATS, default=list(FRAME_FORMATS))
+    parser.add_argument("--compression", nargs="*", choices=list(COMPRESSION), default=list(COMPRESSION))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    messages = bid_stream(args.updates, args.auctions)
+    print(f"⏱️  {args.updates} updates over {args.auctions} auction(s), "
+          f"deflate window 2^{settings.WS_DEFLATE_WINDOW_BITS}, memLevel {settings.WS_DEFLATE_MEM_LEVEL}")
+
+    baseline = None
+    print("=" * 96)
+    print(f"{'format':<20}{'compression':<18}{'B/update':>10}{'vs json':>9}"
+          f"{'encode µs':>11}{'compress µs':>13}{'memory/conn':>13}")
+    print("=" * 96)
+    for frame_format in args.formats:
+        for compression in args.compression:
+            r = run(frame_format, compression, messages)
+            baseline = baseline or r["bytes_per_update"]
+            print(f"{frame_format:<20}{compression:<18}{r['bytes_per_update']:>10.1f}"
+                  f"{r['bytes_per_update'] / baseline:>8.0%} {r['encode_us']:>10.2f}{r['compress_us']:>13.2f}"
+                  f"{r['memory_bytes'] / 1024:>10.1f} KiB")
+    print("encode µs is paid once per broadcast; compress µs and memory are paid per subscriber connection.")
+
+
+if __name__ == "__main__":
+    main()
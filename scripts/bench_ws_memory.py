@@ -0,0 +1,105 @@
+"""Memory cost of idle WebSocket connections.
+
+Two measurements:
+
+1. In-process (default): ``tracemalloc`` measures the ConnectionManager
+   bookkeeping per connection (Connection record, Subscription, room sets and
+   index dicts). Stub sockets are used, so the socket objects themselves are
+   not counted.
+2. Live (``--url``): opens N idle sockets against a running server and compares
+   ``rss_bytes`` from ``/api/v1/ws/stats`` before and after. This includes the
+   ASGI server's per-socket buffers and protocol state.
+
+Usage:
+    python scripts/bench_ws_memory.py --connections 10000
+    python scripts/bench_ws_memory.py --connections 2000 --url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+import httpx  # Asynchronous HTTP client (pip install httpx)
+import websockets
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.websocket import ConnectionManager  # noqa: E402
+
+
+class StubWebSocket:
+    """Minimal stand-in for a Starlette WebSocket."""
+
+    scope = {"subprotocols": []}
+
+    async def accept(self, subprotocol: Optional[str] = None) -> None:
+        pass
+
+
+async def measure_in_process(connections: int, subscriptions: int, auctions: int) -> float:
+    """Return manager bookkeeping bytes per connection."""
+    sockets = [StubWebSocket() for _ in range(connections)]
+    auction_ids = [str(i) for i in range(auctions)]
+    manager = ConnectionManager()
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for i, websocket in enumerate(sockets):
+        connection = await manager.accept(websocket)
+        for j in range(subscriptions):
+            manager.subscribe(connection, auction_ids[(i + j) % auctions])
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (after - before) / connections
+
+
+async def measure_live(base_url: str, connections: int) -> None:
+    """Open idle sockets against a running server and report RSS growth per connection."""
+    ws_base = base_url.replace("http", "ws", 1)
+    async with httpx.AsyncClient() as client:
+        before = (await client.get(f"{base_url}/api/v1/ws/stats")).json()
+
+        sockets = []
+        try:
+            for i in range(connections):
+                sockets.append(await websockets.connect(f"{ws_base}/api/v1/ws/auction/{i % 100}"))
+            await asyncio.sleep(1.0)
+            after = (await client.get(f"{base_url}/api/v1/ws/stats")).json()
+        finally:
+            await asyncio.gather(*(ws.close() for ws in sockets), return_exceptions=True)
+
+    if before["rss_bytes"] is None or after["rss_bytes"] is None:
+        print("Server does not report RSS (non-Linux host)")
+        return
+    opened = after["connections"] - before["connections"]
+    growth = after["rss_bytes"] - before["rss_bytes"]
+    print(f"Live server: {opened} idle connections, RSS +{growth / 1024 / 1024:.1f} MiB "
+          f"-> {growth / max(opened, 1):.0f} bytes/connection")
+
+
+async def main() -> None:
+    """Run the selected memory measurements."""
+    parser = argparse.ArgumentParser(description="Memory per idle WebSocket connection")
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--auctions", type=int, default=100, help="Distinct rooms")
+    parser.add_argument("--url", help="Also measure a running server, e.g. http://localhost:8000")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"ConnectionManager bookkeeping ({args.connections} connections, {args.auctions} rooms)")
+    print("=" * 50)
+    for subscriptions in (0, 1, 10):
+        per_connection = await measure_in_process(args.connections, subscriptions, args.auctions)
+        print(f"{subscriptions:3d} subscription(s)/connection: {per_connection:7.0f} bytes/connection")
+
+    if args.url:
+        print()
+        await measure_live(args.url, args.connections)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
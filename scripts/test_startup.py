@@ -0,0 +1,128 @@
+"""Cold-start audit for the API, server, worker, closer and replay entry points.
+
+For each entry module this script checks, in a fresh interpreter, that:
+
+1. Importing it stays within a wall-clock budget (best of several runs).
+2. No Redis client or database engine is created at import time.
+3. It does not import modules it never uses (e.g. the worker must not load
+   FastAPI or the WebSocket layer).
+
+It also prints the slowest imports from ``python -X importtime`` so a budget
+regression can be traced to the module that caused it.
+
+Usage: python scripts/test_startup.py [--runs 5] [--top 10]
+Exits non-zero when any check fails.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# entry module -> (import budget in ms, modules that must not be imported)
+ENTRY_POINTS = {
+    "app.main": (1500, ()),
+    "app.server": (1500, ("app.main",)),
+    "app.worker": (1000, ("fastapi", "starlette", "app.api", "app.main", "app.services.websocket")),
+    "app.closer": (1000, ("fastapi", "starlette", "app.api", "app.main", "app.services.websocket")),
+    "app.replay": (1000, ("fastapi", "starlette", "app.api", "app.main", "app.services.websocket")),
+}
+
+# Runs after the import in the child process; fails if a client was created eagerly.
+LAZY_CHECK = """
+import sys
+from app.db import session
+from app.services.redis import RedisService
+assert session._engine is None, "database engine created at import time"
+assert RedisService._client is None, "Redis client created at import time"
+forbidden = [m for m in sys.argv[1:] if m in sys.modules]
+assert not forbidden, f"unexpected imports: {forbidden}"
+"""
+
+
+def measure_import_ms(module: str, runs: int) -> float:
+    """Return the best wall-clock time (ms) to start an interpreter and import the module."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], cwd=PROJECT_ROOT, check=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def slowest_imports(module: str, top: int) -> list[tuple[int, str]]:
+    """Return the top-N modules by cumulative import time (µs) from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, cumulative, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        if name.strip() != module:
+            entries.append((int(cumulative), name.strip()))
+    entries.sort(reverse=True)
+    return entries[:top]
+
+
+def check_lazy(module: str, forbidden: tuple[str, ...]) -> str | None:
+    """Import the module and run LAZY_CHECK; return an error message on failure."""
+    result = subprocess.run(
+        [sys.executable, "-c", f"import {module}\n{LAZY_CHECK}", *forbidden],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return result.stderr.strip().splitlines()[-1]
+    return None
+
+
+def main() -> None:
+    """Run the startup audit for every entry point."""
+    parser = argparse.ArgumentParser(description="Import-time audit and startup budget check")
+    parser.add_argument("--runs", type=int, default=5, help="Import timings per entry point")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    failures = []
+    for module, (budget_ms, forbidden) in ENTRY_POINTS.items():
+        print("=" * 50)
+        print(f"{module} (budget: {budget_ms} ms)")
+        print("=" * 50)
+
+        elapsed_ms = measure_import_ms(module, args.runs)
+        status = "OK" if elapsed_ms <= budget_ms else "OVER BUDGET"
+        print(f"Interpreter start + import: {elapsed_ms:.0f} ms [{status}]")
+        if elapsed_ms > budget_ms:
+            failures.append(f"{module}: {elapsed_ms:.0f} ms > {budget_ms} ms")
+
+        error = check_lazy(module, forbidden)
+        print(f"Lazy clients / import hygiene: {'OK' if error is None else error}")
+        if error is not None:
+            failures.append(f"{module}: {error}")
+
+        print("Slowest imports (cumulative):")
+        for cumulative_us, name in slowest_imports(module, args.top):
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+        print()
+
+    if failures:
+        print("✗ Startup audit FAILED:")
+        for failure in failures:
+            print(f"  ✗ {failure}")
+        sys.exit(1)
+    print("✓ Startup audit PASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""WebSocket fan-out load test for the auction notification path.
+
+While bids are driven against the Go bid API, this script keeps N concurrent
+WebSocket subscribers per auction open on ``/api/v1/ws/auction/{auction_id}``.
+Every update a subscriber receives is matched to the bid that caused it, and
+the script reports:
+
+- bid-to-screen latency percentiles (bid request sent -> update received)
+- missed updates (accepted bids a subscriber never saw) and out-of-order updates
+- fan-out throughput per WebSocket node
+
+Usage (against the local docker-compose stack):
+    python scripts/ws_load_test.py --auctions 5 --subscribers 200 --bid-rate 50 --duration 30
+
+Pass ``--ws-url`` several times to spread subscribers across multiple
+WebSocket server nodes; throughput is then reported per node.
+``--frame-format`` picks the subscribers' frame format, and
+``--no-compression`` turns off permessage-deflate on their side (see
+scripts/bench_ws_frames.py for the bytes per update of each format).
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx  # Asynchronous HTTP client (pip install httpx)
+import websockets
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.ws_frames import FRAME_FORMATS, FRAME_JSON, decode_binary  # noqa: E402
+
+
+DEFAULT_APP_URL = "http://localhost:8000"
+DEFAULT_BID_URL = "http://localhost:8080"
+DEFAULT_WS_URL = "ws://localhost:8000"
+TEST_AUCTION_PRICE = 1000
+
+
+@dataclass
+class SubscriberStats:
+    """Delivery statistics collected by a single WebSocket subscriber."""
+
+    node: str
+    auction_id: int
+    received: int = 0
+    duplicates: int = 0
+    out_of_order: int = 0
+    unmatched: int = 0
+    last_amount: int = 0
+    seen: set[int] = field(default_factory=set)
+
+
+@dataclass
+class BidLedger:
+    """Send timestamps and outcomes of every bid issued during the test."""
+
+    sent_at: dict[tuple[int, int], float] = field(default_factory=dict)
+    accepted: dict[int, set[int]] = field(default_factory=lambda: defaultdict(set))
+    rejected: int = 0
+    failed: int = 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="WebSocket subscriber load generator")
+    parser.add_argument("--app-url", default=DEFAULT_APP_URL, help="Python API base URL")
+    parser.add_argument("--bid-url", default=DEFAULT_BID_URL, help="Go bid API base URL")
+    parser.add_argument(
+        "--ws-url",
+        action="append",
+        dest="ws_urls",
+        help="WebSocket node base URL (repeat for several nodes)",
+    )
+    parser.add_argument("--auctions", type=int, default=5, help="Auctions to create")
+    parser.add_argument(
+        "--auction-ids",
+        type=int,
+        nargs="*",
+        help="Use existing auctions instead of creating new ones",
+    )
+    parser.add_argument("--subscribers", type=int, default=100, help="Subscribers per auction")
+    parser.add_argument("--bid-rate", type=float, default=20.0, help="Bids per second (total)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Bid load duration (s)")
+    parser.add_argument("--drain", type=float, default=3.0, help="Wait for late updates (s)")
+    parser.add_argument("--frame-format", choices=FRAME_FORMATS, default=FRAME_JSON,
+                        help="WebSocket subprotocol offered by the subscribers")
+    parser.add_argument("--no-compression", action="store_true", help="Do not offer permessage-deflate")
+    args = parser.parse_args()
+    args.ws_urls = args.ws_urls or [DEFAULT_WS_URL]
+    return args
+
+
+async def create_test_auctions(client: httpx.AsyncClient, app_url: str, count: int) -> list[int]:
+    """Create fresh auctions (one bulk request) so the test does not depend on prior DB state."""
+    response = await client.post(
+        f"{app_url}/api/v1/auctions/bulk",
+        json={
+            "auctions": [
+                {"item_name": f"ws-load-test-{int(time.time())}-{i}", "current_price": TEST_AUCTION_PRICE}
+                for i in range(count)
+            ],
+            "seed_redis": True,
+        },
+    )
+    response.raise_for_status()
+    return [auction["id"] for auction in response.json()["created"]]
+
+
+async def fetch_current_prices(client: httpx.AsyncClient, app_url: str) -> dict[int, int]:
+    """Return the current price of every auction known to the API."""
+    response = await client.get(f"{app_url}/api/v1/auctions")
+    response.raise_for_status()
+    return {a["id"]: a["current_price"] for a in response.json()}
+
+
+async def subscribe(
+    ws_url: str,
+    stats: SubscriberStats,
+    ledger: BidLedger,
+    latencies: list[float],
+    receive_times: dict[str, list[float]],
+    ready: asyncio.Event,
+    connected: list[int],
+    expected: int,
+    stop: asyncio.Event,
+    frame_format: str,
+    compression: bool,
+) -> None:
+    """Hold one WebSocket subscription open and record every update it receives."""
+    url = f"{ws_url}/api/v1/ws/auction/{stats.auction_id}"
+    async with websockets.connect(
+        url,
+        max_queue=None,
+        subprotocols=[frame_format],
+        compression="deflate" if compression else None,
+    ) as ws:
+        connected[0] += 1
+        if connected[0] >= expected:
+            ready.set()
+
+        while not stop.is_set():
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            now = time.perf_counter()
+
+            try:
+                payload = decode_binary(raw) if isinstance(raw, bytes) else json.loads(raw)
+                if payload.get("type") == "ping":
+                    await ws.send('{"type": "pong"}')  # Keep the server's idle reaper away
+                    continue
+                if "c" in payload:
+                    continue  # auction_closed in the compact/binary formats
+                # Compact/binary updates use short keys, the full JSON format the BidTask names
+                amount = int(payload["p"] if "p" in payload else payload["amount"])
+                auction_id = int(payload["a"] if "a" in payload else payload["auction_id"])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                continue  # Not a price update
+            if auction_id != stats.auction_id:
+                stats.unmatched += 1
+                continue
+
+            stats.received += 1
+            receive_times[stats.node].append(now)
+
+            if amount in stats.seen:
+                stats.duplicates += 1
+                continue
+            stats.seen.add(amount)
+
+            if amount < stats.last_amount:
+                stats.out_of_order += 1
+            else:
+                stats.last_amount = amount
+
+            sent_at = ledger.sent_at.get((auction_id, amount))
+            if sent_at is None:
+                stats.unmatched += 1
+            else:
+                latencies.append(now - sent_at)
+
+
+async def place_bid(
+    client: httpx.AsyncClient,
+    bid_url: str,
+    ledger: BidLedger,
+    auction_id: int,
+    amount: int,
+) -> None:
+    """Send a single bid and record whether it was accepted."""
+    ledger.sent_at[(auction_id, amount)] = time.perf_counter()
+    try:
+        response = await client.post(
+            f"{bid_url}/api/v1/bid",
+            json={
+                "user_id": random.randint(1, 100),
+                "auction_id": auction_id,
+                "amount": amount,
+            },
+        )
+    except httpx.HTTPError:
+        ledger.failed += 1
+        return
+
+    if response.status_code == 202:
+        ledger.accepted[auction_id].add(amount)
+    elif response.status_code == 409:
+        ledger.rejected += 1
+    else:
+        ledger.failed += 1
+
+
+async def drive_bids(
+    client: httpx.AsyncClient,
+    bid_url: str,
+    ledger: BidLedger,
+    prices: dict[int, int],
+    rate: float,
+    duration: float,
+) -> None:
+    """Issue strictly increasing bids round-robin across auctions at a fixed rate."""
+    interval = 1.0 / rate
+    pending = set()
+    auction_cycle = itertools.cycle(list(prices))
+    deadline = time.perf_counter() + duration
+    next_at = time.perf_counter()
+
+    while time.perf_counter() < deadline:
+        auction_id = next(auction_cycle)
+        prices[auction_id] += random.randint(10, 100)
+        task = asyncio.create_task(
+            place_bid(client, bid_url, ledger, auction_id, prices[auction_id])
+        )
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+        next_at += interval
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+    if pending:
+        await asyncio.gather(*pending)
+
+
+def percentile_line(latencies: list[float]) -> str:
+    """Format p50/p95/p99/max of a latency sample in milliseconds."""
+    if len(latencies) < 2:
+        return "not enough samples"
+    q = statistics.quantiles(latencies, n=100)
+    return (
+        f"p50={q[49] * 1000:.1f}ms  p95={q[94] * 1000:.1f}ms  "
+        f"p99={q[98] * 1000:.1f}ms  max={max(latencies) * 1000:.1f}ms"
+    )
+
+
+def print_report(
+    subscribers: list[SubscriberStats],
+    ledger: BidLedger,
+    latencies: list[float],
+    receive_times: dict[str, list[float]],
+) -> None:
+    """Print the latency, delivery and throughput summary."""
+    total_accepted = sum(len(amounts) for amounts in ledger.accepted.values())
+    expected = sum(len(ledger.accepted[s.auction_id]) for s in subscribers)
+    delivered = sum(len(s.seen & ledger.accepted[s.auction_id]) for s in subscribers)
+
+    print("=" * 50)
+    print("BIDS:")
+    print("=" * 50)
+    print(f"Sent: {len(ledger.sent_at)}  Accepted (202): {total_accepted}  "
+          f"Rejected (409): {ledger.rejected}  Failed: {ledger.failed}")
+    print()
+
+    print("=" * 50)
+    print("BID-TO-SCREEN LATENCY:")
+    print("=" * 50)
+    print(f"Samples: {len(latencies)}")
+    print(percentile_line(latencies))
+    print()
+
+    print("=" * 50)
+    print("DELIVERY:")
+    print("=" * 50)
+    print(f"Expected updates (accepted bids x subscribers): {expected}")
+    print(f"Delivered: {delivered}  Missed: {expected - delivered} "
+          f"({(expected - delivered) / max(expected, 1) * 100:.2f}%)")
+    print(f"Out-of-order: {sum(s.out_of_order for s in subscribers)}  "
+          f"Duplicates: {sum(s.duplicates for s in subscribers)}  "
+          f"Unmatched: {sum(s.unmatched for s in subscribers)}")
+    print()
+
+    print("=" * 50)
+    print("FAN-OUT THROUGHPUT PER NODE:")
+    print("=" * 50)
+    for node, times in receive_times.items():
+        node_subscribers = sum(1 for s in subscribers if s.node == node)
+        if len(times) < 2:
+            print(f"{node}: {len(times)} messages to {node_subscribers} subscribers")
+            continue
+        window = max(times) - min(times)
+        print(f"{node}: {len(times)} messages to {node_subscribers} subscribers "
+              f"in {window:.2f}s -> {len(times) / max(window, 1e-9):.0f} msg/s")
+
+
+async def main() -> None:
+    """Run the WebSocket fan-out load test."""
+    args = parse_args()
+    limits = httpx.Limits(max_connections=200, max_keepalive_connections=200)
+
+    async with httpx.AsyncClient(limits=limits, timeout=10.0) as client:
+        print("=" * 50)
+        print("STEP 1: Preparing auctions...")
+        auction_ids = args.auction_ids or await create_test_auctions(
+            client, args.app_url, args.auctions
+        )
+        current = await fetch_current_prices(client, args.app_url)
+        prices = {aid: current.get(aid, TEST_AUCTION_PRICE) for aid in auction_ids}
+        print(f"✓ Auctions: {auction_ids}")
+        print()
+
+        print(f"STEP 2: Opening {args.subscribers} subscribers per auction "
+              f"across {len(args.ws_urls)} node(s) ({args.frame_format}, "
+              f"{'no compression' if args.no_compression else 'permessage-deflate offered'})...")
+        ledger = BidLedger()
+        latencies: list[float] = []
+        receive_times: dict[str, list[float]] = {url: [] for url in args.ws_urls}
+        ready, stop = asyncio.Event(), asyncio.Event()
+        connected = [0]
+        node_cycle = itertools.cycle(args.ws_urls)
+
+        subscribers = [
+            SubscriberStats(node=next(node_cycle), auction_id=aid)
+            for aid in auction_ids
+            for _ in range(args.subscribers)
+        ]
+        subscriber_tasks = [
+            asyncio.create_task(
+                subscribe(s.node, s, ledger, latencies, receive_times,
+                          ready, connected, len(subscribers), stop,
+                          args.frame_format, not args.no_compression)
+            )
+            for s in subscribers
+        ]
+        try:
+            await asyncio.wait_for(ready.wait(), timeout=60)
+        except asyncio.TimeoutError:
+            print(f"⚠️  Only {connected[0]}/{len(subscribers)} subscribers connected, continuing")
+        print(f"✓ {connected[0]} subscribers connected")
+        print()
+
+        print(f"STEP 3: Driving {args.bid_rate:.0f} bids/s for {args.duration:.0f}s...")
+        await drive_bids(client, args.bid_url, ledger, prices, args.bid_rate, args.duration)
+        await asyncio.sleep(args.drain)
+        stop.set()
+        results = await asyncio.gather(*subscriber_tasks, return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors:
+            print(f"⚠️  {len(errors)} subscribers failed: {errors[0]!r}")
+        print()
+
+    print_report(subscribers, ledger, latencies, receive_times)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
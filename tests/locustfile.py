@@ -45,29 +45,30 @@ def on_test_start(environment, **kwargs):
     print(f"🌐 Bid API base: {bid_api_base}")
 
     try:
-        # 1. Create test users (1-100)
+        # 1. Create test users (1-100) in one request; existing usernames come back as conflicts
         print("👥 Creating test users...")
-        for i in range(1, 101):
-            user_payload = {"username": f"test-user-{i}"}
-            requests.post(f"{app_api_base}/api/v1/users", json=user_payload)
-            # Ignore if user already exists
-
-        print("✅ Created/verified 100 test users")
-
-        # 2. Create test auctions with varied starting prices
+        users = [{"username": f"test-user-{i}"} for i in range(1, 101)]
+        resp = requests.post(f"{app_api_base}/api/v1/users/bulk", json={"users": users})
+        resp.raise_for_status()
+        result = resp.json()
+        print(f"✅ Created/verified 100 test users ({len(result['created'])} new, "
+              f"{len(result['conflicts'])} already existed)")
+
+        # 2. Create test auctions with varied starting prices, pre-seeding the Redis price cache
         print("🎁 Creating test auctions...")
-        for i in range(1, 6):  # Create 5 auctions
-            start_price = random.randint(1000, 5000)
-            payload = {
-                "item_name": f"test-auction-item-{i}",
-                "current_price": start_price,
-            }
-            resp = requests.post(f"{app_api_base}/api/v1/auctions", json=payload)
-            if resp.status_code == 200:
-                auction_data = resp.json()
+        auctions = [
+            {"item_name": f"test-auction-item-{i}", "current_price": random.randint(1000, 5000)}
+            for i in range(1, 6)  # Create 5 auctions
+        ]
+        resp = requests.post(
+            f"{app_api_base}/api/v1/auctions/bulk",
+            json={"auctions": auctions, "seed_redis": True},
+        )
+        if resp.status_code == 200:
+            for auction_data in resp.json()["created"]:
                 auction_id = auction_data["id"]
                 auction_ids.append(auction_id)
-                auction_prices[auction_id] = start_price
+                auction_prices[auction_id] = auction_data["current_price"]
                 last_price_update[auction_id] = time.time()
 
         print(f"✅ Created {len(auction_ids)} auctions: {auction_ids}")